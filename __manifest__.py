@@ -1,7 +1,7 @@
 {
     'name': 'Social Hub',
     'summary': 'Manage social media platforms, accounts and streams without IAP credits',
-    'version': '19.0.4.0.0',
+    'version': '19.0.4.1.0',
     'category': 'Marketing',
     'author': 'mamingxing',
     'company': 'iMyTest',
@@ -16,8 +16,16 @@
         'views/social_hub_platform_views.xml',
         'views/social_hub_account_views.xml',
         'views/social_hub_post_views.xml',
+        'views/social_hub_campaign_views.xml',
+        'views/social_hub_post_metric_views.xml',
+        'views/social_hub_publish_attempt_views.xml',
         'views/social_hub_stream_views.xml',
         'views/res_config_settings_views.xml',
+        'views/social_hub_rate_limit_views.xml',
+        'views/social_hub_webhook_event_views.xml',
+        'views/social_hub_cron_run_views.xml',
+        'views/social_hub_tag_views.xml',
+        'views/social_hub_media_check_views.xml',
     ],
     'application': True,
     'installable': True,
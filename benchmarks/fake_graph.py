@@ -0,0 +1,257 @@
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+VERSION_RE = re.compile(r'^v\d+\.\d+$')
+
+
+class FakeGraphState:
+
+    def __init__(self, latency_ms=50, jitter_ms=20, error_rate=0.0, throttle_rate=0.0,
+                 app_usage_pct=10, video_delay_seconds=30, pages_per_user=25, page_size=100):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.app_usage_pct = app_usage_pct
+        self.video_delay_seconds = video_delay_seconds
+        self.pages_per_user = pages_per_user
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.containers = {}
+        self.calls = Counter()
+
+    def next_id(self, prefix):
+        with self.lock:
+            return f'{prefix}_{next(self.ids)}'
+
+    def count(self, label):
+        with self.lock:
+            self.calls[label] += 1
+
+    def stats(self):
+        with self.lock:
+            return {'total': sum(self.calls.values()), 'calls': dict(self.calls)}
+
+    def reset(self):
+        with self.lock:
+            self.calls.clear()
+            self.containers.clear()
+
+    def usage_headers(self):
+        usage = {'call_count': self.app_usage_pct, 'total_time': self.app_usage_pct // 2, 'total_cputime': self.app_usage_pct // 2}
+        return {'X-App-Usage': json.dumps(usage)}
+
+    def error_response(self):
+        roll = random.random()
+        if roll < self.throttle_rate:
+            return 400, {'error': {'message': 'Application request limit reached', 'type': 'OAuthException', 'code': 4}}
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, {'error': {'message': 'An unexpected error has occurred', 'type': 'OAuthException', 'code': 2, 'is_transient': True}}
+        return None
+
+    def user_pages(self, token, after):
+        seed = token.split('~')[0]
+        start = int(after or 0)
+        stop = min(self.pages_per_user, start + self.page_size)
+        data = [
+            {
+                'id': f'page_{seed}_{index}',
+                'name': f'Benchmark Page {seed}-{index}',
+                'access_token': f'page_token_{seed}_{index}',
+                'link': f'https://example.com/page_{seed}_{index}',
+                'instagram_business_account': {
+                    'id': f'ig_{seed}_{index}',
+                    'username': f'bench_{seed}_{index}',
+                    'name': f'Benchmark IG {seed}-{index}',
+                },
+            }
+            for index in range(start, stop)
+        ]
+        payload = {'data': data}
+        if stop < self.pages_per_user:
+            payload['paging'] = {'cursors': {'after': str(stop)}, 'next': f'__self__/me/accounts?access_token={token}&after={stop}'}
+        return payload
+
+    def handle(self, method, path, params):
+        parts = [part for part in path.split('/') if part]
+        if parts and VERSION_RE.match(parts[0]):
+            parts = parts[1:]
+        failure = self.error_response()
+        if failure:
+            self.count('error')
+            return failure
+
+        if parts == ['oauth', 'access_token']:
+            self.count('oauth_access_token')
+            user = (params.get('fb_exchange_token') or params.get('code') or 'user_token').split('~')[0]
+            return 200, {'access_token': f"{user}~{self.next_id('refresh')}", 'token_type': 'bearer', 'expires_in': 5184000}
+        if parts == ['me']:
+            self.count('me')
+            return 200, {'id': 'bench_user', 'name': 'Benchmark User'}
+        if parts == ['me', 'accounts']:
+            self.count('me_accounts')
+            return 200, self.user_pages(params.get('access_token', ''), params.get('after'))
+        if method == 'POST' and len(parts) == 2 and parts[1] in ('feed', 'photos', 'videos'):
+            self.count(f'page_{parts[1]}')
+            return 200, {'id': self.next_id(f'{parts[0]}_post')}
+        if method == 'POST' and len(parts) == 2 and parts[1] == 'media':
+            self.count('ig_media')
+            creation_id = self.next_id('container')
+            ready_at = time.monotonic() + (self.video_delay_seconds if params.get('video_url') else 0)
+            with self.lock:
+                self.containers[creation_id] = ready_at
+            return 200, {'id': creation_id}
+        if method == 'POST' and len(parts) == 2 and parts[1] == 'media_publish':
+            self.count('ig_media_publish')
+            with self.lock:
+                ready_at = self.containers.get(params.get('creation_id'))
+            if ready_at is None or ready_at > time.monotonic():
+                return 400, {'error': {'message': 'Media is not ready', 'type': 'OAuthException', 'code': 9007, 'error_subcode': 2207027}}
+            return 200, {'id': self.next_id('ig_media')}
+        if len(parts) == 2 and parts[1] == 'insights':
+            self.count('insights')
+            metrics = (params.get('metric') or '').split(',')
+            return 200, {'data': [
+                {'name': name, 'period': 'lifetime', 'values': [{'value': random.randint(0, 10000)}]}
+                for name in metrics if name
+            ]}
+        if method == 'GET' and len(parts) == 1:
+            self.count('object')
+            object_id = parts[0]
+            with self.lock:
+                ready_at = self.containers.get(object_id)
+            if ready_at is not None:
+                status_code = 'FINISHED' if ready_at <= time.monotonic() else 'IN_PROGRESS'
+                return 200, {'id': object_id, 'status_code': status_code, 'status': status_code}
+            return 200, {
+                'id': object_id,
+                'permalink_url': f'https://example.com/{object_id}',
+                'permalink': f'https://example.com/{object_id}',
+            }
+        self.count('unknown')
+        return 404, {'error': {'message': f'Unknown path {path}', 'type': 'GraphMethodException', 'code': 100}}
+
+
+class FakeGraphHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_params(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+        return url.path, params
+
+    def _respond(self, status, payload):
+        state = self.server.state
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in state.usage_headers().items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _sleep(self):
+        state = self.server.state
+        delay = state.latency_ms + random.uniform(-state.jitter_ms, state.jitter_ms)
+        time.sleep(max(0.0, delay) / 1000.0)
+
+    def _dispatch(self, method):
+        state = self.server.state
+        path, params = self._read_params()
+        if path == '/__stats':
+            return self._respond(200, state.stats())
+        if path == '/__reset':
+            state.reset()
+            return self._respond(200, {'reset': True})
+
+        self._sleep()
+        if method == 'POST' and params.get('batch') and path.rstrip('/').count('/') <= 1:
+            state.count('batch')
+            results = []
+            for item in json.loads(params['batch']):
+                item_url = urlsplit('/' + item['relative_url'].lstrip('/'))
+                item_params = dict(parse_qsl(item_url.query))
+                item_params.update(parse_qsl(item.get('body') or ''))
+                status, payload = state.handle(item.get('method', 'GET').upper(), item_url.path, item_params)
+                results.append({'code': status, 'headers': [], 'body': json.dumps(payload)})
+            return self._respond(200, results)
+
+        status, payload = state.handle(method, path, params)
+        paging = payload.get('paging') if isinstance(payload, dict) else None
+        if paging and paging.get('next', '').startswith('__self__'):
+            host = self.headers.get('Host')
+            version = path.split('/')[1]
+            paging['next'] = paging['next'].replace('__self__', f'http://{host}/{version}', 1)
+        return self._respond(status, payload)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    server = ThreadingHTTPServer((host, port), FakeGraphHandler)
+    server.daemon_threads = True
+    server.state = FakeGraphState(**options)
+    thread = threading.Thread(target=server.serve_forever, name='fake_graph', daemon=True)
+    thread.start()
+    return server
+
+
+def add_server_arguments(parser):
+    parser.add_argument('--latency-ms', type=int, default=50)
+    parser.add_argument('--jitter-ms', type=int, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of calls answered with a transient 500.')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Share of calls answered with error code 4.')
+    parser.add_argument('--app-usage-pct', type=int, default=10, help='call_count reported in X-App-Usage.')
+    parser.add_argument('--video-delay-seconds', type=int, default=30, help='Time before an IG video container is FINISHED.')
+    parser.add_argument('--pages-per-user', type=int, default=25)
+
+
+def server_options(args):
+    return {
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'app_usage_pct': args.app_usage_pct,
+        'video_delay_seconds': args.video_delay_seconds,
+        'pages_per_user': args.pages_per_user,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Meta Graph API used by the Social Hub benchmarks.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    server = start_server(args.host, args.port, **server_options(args))
+    print(f'Fake Graph API listening on http://{args.host}:{server.server_address[1]}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_graph import add_server_arguments, server_options, start_server  # noqa: E402
+
+BENCH_COMPANY_NAME = 'Social Hub Benchmark'
+BENCH_PARAMS = (
+    'social_hub.graph_base_url',
+    'social_hub.publish_batch_size',
+    'social_hub.publish_workers',
+    'social_hub.publish_account_concurrency',
+    'social_hub.token_refresh_workers',
+)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def sql_count():
+    from odoo import sql_db
+    return getattr(sql_db, 'sql_counter', 0)
+
+
+class Measure:
+
+    def __init__(self, name, server):
+        self.name = name
+        self.server = server
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.server.state.reset()
+        self.sql_start = sql_count()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.started
+        self.sql = sql_count() - self.sql_start
+        self.graph = self.server.state.stats()
+
+    def add_latency(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def report(self, items, unit):
+        return {
+            'scenario': self.name,
+            unit: items,
+            'seconds': round(self.elapsed, 3),
+            'throughput_per_second': round(items / self.elapsed, 2) if self.elapsed else 0.0,
+            'latency_ms': {
+                'p50': round(percentile(self.latencies, 50) * 1000, 1),
+                'p95': round(percentile(self.latencies, 95) * 1000, 1),
+                'p99': round(percentile(self.latencies, 99) * 1000, 1),
+            },
+            'sql_queries': self.sql,
+            'sql_queries_per_item': round(self.sql / items, 2) if items else 0.0,
+            'graph_calls': self.graph['total'],
+            'graph_calls_by_endpoint': self.graph['calls'],
+        }
+
+
+def timed_method(model_class, method_name, measure):
+    original = getattr(model_class, method_name)
+
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            measure.add_latency(time.perf_counter() - started)
+
+    setattr(model_class, method_name, wrapper)
+    return original
+
+
+def setup(env, args, graph_url):
+    from odoo import fields
+
+    params = env['ir.config_parameter'].sudo()
+    saved_params = {key: params.get_param(key) for key in BENCH_PARAMS}
+    params.set_param('social_hub.graph_base_url', graph_url)
+    params.set_param('social_hub.publish_batch_size', args.batch_size)
+    params.set_param('social_hub.publish_workers', args.workers)
+    params.set_param('social_hub.publish_account_concurrency', args.account_concurrency)
+    params.set_param('social_hub.token_refresh_workers', args.workers)
+
+    company = env['res.company'].create({'name': f'{BENCH_COMPANY_NAME} {int(time.time())}'})
+    env['social.hub.meta.config'].create({
+        'company_id': company.id,
+        'meta_app_id': 'bench_app',
+        'meta_app_secret': 'bench_secret',
+    })
+
+    platforms = {
+        platform.code: platform
+        for platform in env['social.hub.platform'].search([('code', 'in', ['facebook', 'instagram'])])
+    }
+    expires_at = fields.Datetime.now() + timedelta(days=1)
+    account_vals = []
+    for index in range(args.accounts):
+        code = 'facebook' if index % 2 == 0 else 'instagram'
+        user_token = f'user_token_{index // args.accounts_per_user}'
+        page_index = index % args.accounts_per_user
+        account_vals.append({
+            'name': f'Bench {code} {index}',
+            'platform_id': platforms[code].id,
+            'handle': f'bench_{code}_{index}',
+            'external_uid': f'ig_{user_token}_{page_index}' if code == 'instagram' else f'page_{user_token}_{page_index}',
+            'access_token': f'page_token_{user_token}_{page_index}',
+            'meta_user_access_token': user_token,
+            'meta_user_token_expires_at': expires_at,
+            'state': 'connected',
+            'company_id': company.id,
+        })
+    accounts = env['social.hub.account'].create(account_vals)
+
+    post_vals = []
+    for index in range(args.posts):
+        account = accounts[index % len(accounts)]
+        media_type = 'image'
+        if index % 10 == 0:
+            media_type = 'video'
+        elif account.platform_code == 'facebook' and index % 3 == 0:
+            media_type = 'text'
+        post_vals.append({
+            'name': f'Bench post {index}',
+            'account_id': account.id,
+            'message': f'Benchmark message {index}',
+            'media_type': media_type,
+            'image_url': 'https://example.com/image.jpg' if media_type == 'image' else False,
+            'video_url': 'https://example.com/video.mp4' if media_type == 'video' else False,
+            'state': 'queued',
+        })
+    posts = env['social.hub.post'].create(post_vals)
+    env.cr.commit()
+    return company, accounts, posts, saved_params
+
+
+def teardown(env, company, saved_params):
+    env.cr.rollback()
+    env.invalidate_all()
+    posts = env['social.hub.post'].with_context(active_test=False).search([('company_id', '=', company.id)])
+    env['social.hub.post.metric'].search([('post_id', 'in', posts.ids)]).unlink()
+    posts.unlink()
+    env['social.hub.account'].with_context(active_test=False).search([('company_id', '=', company.id)]).unlink()
+    env['social.hub.meta.config'].with_context(active_test=False).search([('company_id', '=', company.id)]).unlink()
+    company.active = False
+    params = env['ir.config_parameter'].sudo()
+    for key, value in saved_params.items():
+        params.set_param(key, value or False)
+    env.cr.commit()
+
+
+def bench_publish_queue(env, server, posts, args):
+    Post = env['social.hub.post']
+    measure = Measure('cron_process_publish_queue', server)
+    original = timed_method(type(Post), '_attempt_publish', measure)
+    deadline = time.monotonic() + args.max_seconds
+    runs = 0
+    try:
+        with measure:
+            while time.monotonic() < deadline:
+                Post.cron_process_publish_queue()
+                env.cr.commit()
+                runs += 1
+                stats = Post.get_queue_stats()
+                if not stats['due'] and not stats['processing']:
+                    break
+            while time.monotonic() < deadline and Post.search_count([('id', 'in', posts.ids), ('state', '=', 'container_pending')]):
+                Post.cron_poll_instagram_containers()
+                env.cr.commit()
+                time.sleep(1)
+    finally:
+        setattr(type(Post), '_attempt_publish', original)
+
+    env.invalidate_all()
+    states = dict(Post._read_group([('id', 'in', posts.ids)], ['state'], ['__count']))
+    report = measure.report(len(measure.latencies), 'attempts')
+    report.update(cron_runs=runs, post_states=states)
+    return report
+
+
+def bench_refresh_tokens(env, server, accounts, args):
+    Account = env['social.hub.account']
+    measure = Measure('cron_refresh_meta_tokens', server)
+    original = timed_method(type(Account), '_meta_refresh_token_group', measure)
+    try:
+        with measure:
+            Account.cron_refresh_meta_tokens()
+            env.cr.commit()
+    finally:
+        setattr(type(Account), '_meta_refresh_token_group', original)
+    report = measure.report(len(accounts), 'accounts')
+    report.update(token_groups=len(measure.latencies))
+    return report
+
+
+def bench_sync(env, server, accounts, args):
+    measure = Measure('_meta_sync_from_user_access_token', server)
+    targets = accounts[:args.sync_accounts]
+    with measure:
+        for account in targets:
+            started = time.perf_counter()
+            account._meta_sync_from_user_access_token(account.meta_user_access_token)
+            measure.add_latency(time.perf_counter() - started)
+        env.cr.commit()
+    return measure.report(len(targets), 'accounts')
+
+
+def print_report(report):
+    print(f"\n== {report['scenario']}")
+    for key, value in report.items():
+        if key != 'scenario':
+            print(f'  {key}: {value}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Seed a scratch Odoo database with Social Hub accounts and posts and benchmark the '
+                    'publish queue, token refresh and asset sync against a local fake Graph API. '
+                    'Run it on a disposable database: the crons commit as they go.',
+    )
+    parser.add_argument('-c', '--config', help='Odoo configuration file.')
+    parser.add_argument('-d', '--database', required=True)
+    parser.add_argument('--addons-path')
+    parser.add_argument('--scenario', choices=['all', 'publish', 'refresh', 'sync'], default='all')
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument(
+        '--accounts-per-user', type=int, default=10,
+        help='Accounts sharing one Meta user token; keep it at or below --pages-per-user.',
+    )
+    parser.add_argument('--sync-accounts', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--account-concurrency', type=int, default=1)
+    parser.add_argument('--max-seconds', type=int, default=600)
+    parser.add_argument('--json', dest='json_path', help='Also write the reports to this file.')
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded records.')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    import odoo
+    from odoo import SUPERUSER_ID, api
+    from odoo.modules.registry import Registry
+
+    odoo_args = ['-d', args.database]
+    if args.config:
+        odoo_args += ['-c', args.config]
+    if args.addons_path:
+        odoo_args += ['--addons-path', args.addons_path]
+    odoo.tools.config.parse_config(odoo_args)
+
+    server = start_server(**server_options(args))
+    graph_url = f'http://127.0.0.1:{server.server_address[1]}'
+    registry = Registry(args.database)
+    reports = []
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {'tracking_disable': True, 'mail_create_nolog': True})
+        company, accounts, posts, saved_params = setup(env, args, graph_url)
+        try:
+            if args.scenario in ('all', 'publish'):
+                reports.append(bench_publish_queue(env, server, posts, args))
+            if args.scenario in ('all', 'refresh'):
+                reports.append(bench_refresh_tokens(env, server, accounts, args))
+            if args.scenario in ('all', 'sync'):
+                reports.append(bench_sync(env, server, accounts, args))
+        finally:
+            if not args.keep:
+                teardown(env, company, saved_params)
+    server.shutdown()
+
+    for report in reports:
+        print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump(reports, handle, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
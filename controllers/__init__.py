@@ -1 +1,3 @@
 from . import oauth_meta
+from . import metrics
+from . import export
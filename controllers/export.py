@@ -0,0 +1,55 @@
+from odoo import api, http
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request
+
+from ..models.social_hub_export import EXPORT_FORMATS
+
+
+class SocialHubExportController(http.Controller):
+
+    @http.route('/social_hub/export/<string:dataset>', type='http', auth='user', methods=['GET'], save_session=False)
+    def social_hub_export(self, dataset, **kwargs):
+        export_format = kwargs.get('format') or 'ndjson'
+        if export_format not in EXPORT_FORMATS:
+            return request.make_response('Unsupported format', headers=[('Content-Type', 'text/plain')], status=400)
+
+        exporter = request.env['social.hub.export']
+        try:
+            domain = exporter._export_domain(dataset, kwargs)
+            after_id = int(kwargs.get('after_id') or 0)
+        except AccessError as exc:
+            return request.make_response(str(exc), headers=[('Content-Type', 'text/plain')], status=403)
+        except (UserError, ValueError) as exc:
+            return request.make_response(str(exc), headers=[('Content-Type', 'text/plain')], status=400)
+
+        chunks = self._export_chunks(
+            request.env.registry,
+            request.env.uid,
+            dict(request.env.context),
+            dataset,
+            domain,
+            after_id,
+            export_format,
+            exporter._export_columns(dataset),
+        )
+        filename = f'social_hub_{dataset}.{export_format}'
+        return request.make_response(chunks, headers=[
+            ('Content-Type', EXPORT_FORMATS[export_format]),
+            ('Content-Disposition', f'attachment; filename="{filename}"'),
+            ('Cache-Control', 'no-store'),
+            ('X-Accel-Buffering', 'no'),
+        ])
+
+    def _export_chunks(self, registry, uid, context, dataset, domain, after_id, export_format, columns):
+        header = export_format == 'csv'
+        while True:
+            with registry.cursor() as cr:
+                exporter = api.Environment(cr, uid, context)['social.hub.export']
+                rows, last_id = exporter._export_chunk(dataset, domain, after_id)
+                data = exporter._export_encode(rows, export_format, columns, header=header)
+            if data:
+                yield data.encode()
+            header = False
+            if not rows:
+                return
+            after_id = last_id
@@ -0,0 +1,22 @@
+import hmac
+
+from odoo import http
+from odoo.http import request
+
+
+class SocialHubMetricsController(http.Controller):
+
+    @http.route('/social_hub/metrics', type='http', auth='public', methods=['GET'], csrf=False, save_session=False)
+    def social_hub_metrics(self, **kwargs):
+        expected = request.env['ir.config_parameter'].sudo().get_param('social_hub.metrics_token')
+        if not expected:
+            return request.not_found()
+
+        authorization = request.httprequest.headers.get('Authorization') or ''
+        token = authorization[len('Bearer '):] if authorization.startswith('Bearer ') else kwargs.get('token')
+        if not token or not hmac.compare_digest(token, expected):
+            return request.make_response('Forbidden', headers=[('Content-Type', 'text/plain')], status=403)
+
+        gauges = request.env['social.hub.cron.run'].sudo()._prometheus_gauges()
+        body = request.env['social.hub.metric.value'].sudo()._render_prometheus(gauges)
+        return request.make_response(body, headers=[('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')])
@@ -1,3 +1,5 @@
+from markupsafe import Markup, escape
+
 from odoo import fields, http
 from odoo.http import request
 
@@ -12,6 +14,8 @@ class SocialHubMetaOAuthController(http.Controller):
         error_reason = kwargs.get('error_reason')
         error_description = kwargs.get('error_description')
 
+        if not state:
+            return request.redirect('/web?error=social_hub_oauth_state_not_found')
         account = request.env['social.hub.account'].sudo().search([
             ('oauth_state', '=', state),
             ('oauth_provider', '=', 'meta'),
@@ -34,11 +38,28 @@ class SocialHubMetaOAuthController(http.Controller):
             account.write({'state': 'disconnected'})
             return request.redirect(f'/web#id={account.id}&model=social.hub.account&view_type=form')
 
-        try:
-            account._meta_exchange_and_sync(code)
-            account.message_post(body='Meta OAuth connected successfully.')
-        except Exception as exc:
-            account.message_post(body=f'Meta OAuth sync failed: {exc}')
-            account.write({'state': 'disconnected'})
+        account._meta_queue_connect(code)
+        account_url = f'/web#id={account.id}&model=social.hub.account&view_type=form'
+        body = Markup(
+            '<!DOCTYPE html><html><head><meta charset="utf-8"/>'
+            '<meta http-equiv="refresh" content="3;url=%(url)s"/><title>Connecting…</title></head>'
+            '<body><p>Connecting %(name)s to Meta… The account page will show the progress.</p>'
+            '<p><a href="%(url)s">Open the account</a></p></body></html>'
+        ) % {'url': account_url, 'name': escape(account.name)}
+        return request.make_response(body, headers=[('Content-Type', 'text/html; charset=utf-8')])
+
+    @http.route('/social_hub/webhook/meta', type='http', auth='public', methods=['GET', 'POST'], csrf=False, save_session=False)
+    def social_hub_meta_webhook(self, **kwargs):
+        configs = request.env['social.hub.meta.config'].sudo()
+
+        if request.httprequest.method == 'GET':
+            if kwargs.get('hub.mode') == 'subscribe' and configs._check_webhook_verify_token(kwargs.get('hub.verify_token')):
+                return request.make_response(kwargs.get('hub.challenge') or '', headers=[('Content-Type', 'text/plain')])
+            return request.make_response('Forbidden', headers=[('Content-Type', 'text/plain')], status=403)
+
+        body = request.httprequest.get_data()
+        if not configs._check_webhook_signature(body, request.httprequest.headers.get('X-Hub-Signature-256')):
+            return request.make_response('Invalid signature', headers=[('Content-Type', 'text/plain')], status=403)
 
-        return request.redirect(f'/web#id={account.id}&model=social.hub.account&view_type=form')
+        request.env['social.hub.webhook.event'].sudo()._enqueue(body)
+        return request.make_response('EVENT_RECEIVED', headers=[('Content-Type', 'text/plain')])
@@ -0,0 +1,40 @@
+def migrate(cr, version):
+    cr.execute("""
+        SELECT column_name
+          FROM information_schema.columns
+         WHERE table_name = 'social_hub_post'
+           AND column_name IN ('last_error', 'provider_response')
+    """)
+    columns = {row[0] for row in cr.fetchall()}
+    if columns != {'last_error', 'provider_response'}:
+        return
+
+    cr.execute("""
+        WITH moved AS (
+            INSERT INTO social_hub_publish_attempt
+                   (post_id, account_id, attempt_no, outcome, error_message, payload, started_at, duration_ms)
+            SELECT post.id,
+                   post.account_id,
+                   GREATEST(COALESCE(post.attempt_count, 0), 1),
+                   CASE
+                       WHEN post.state = 'posted' THEN 'posted'
+                       WHEN post.state = 'container_pending' THEN 'container_pending'
+                       ELSE COALESCE(post.last_error_class, 'transient')
+                   END,
+                   left(post.last_error, 500),
+                   CASE WHEN post.provider_response IS NOT NULL
+                        THEN jsonb_build_object('provider_response', post.provider_response)
+                   END,
+                   COALESCE(post.write_date, post.create_date, now() AT TIME ZONE 'UTC'),
+                   0
+              FROM social_hub_post post
+             WHERE post.last_attempt_id IS NULL
+               AND (post.last_error IS NOT NULL OR post.provider_response IS NOT NULL)
+         RETURNING id, post_id
+        )
+        UPDATE social_hub_post post
+           SET last_attempt_id = moved.id
+          FROM moved
+         WHERE post.id = moved.post_id
+    """)
+    cr.execute('ALTER TABLE social_hub_post DROP COLUMN last_error, DROP COLUMN provider_response')
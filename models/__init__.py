@@ -1,5 +1,20 @@
+from . import social_hub_worker_mixin
+from . import social_hub_rate_limit
+from . import social_hub_metric_value
+from . import social_hub_cron_run
+from . import social_hub_meta_graph
+from . import social_hub_retry_policy
 from . import social_hub_platform
 from . import social_hub_account
+from . import social_hub_tag
 from . import social_hub_stream
+from . import social_hub_stream_item
+from . import social_hub_webhook_event
+from . import social_hub_post_metric
+from . import social_hub_publish_attempt
+from . import social_hub_media_check
 from . import social_hub_post
+from . import social_hub_campaign
+from . import social_hub_search
+from . import social_hub_export
 from . import res_config_settings
@@ -1,4 +1,10 @@
-from odoo import fields, models
+import hashlib
+import hmac
+
+from odoo import api, fields, models, tools
+
+DEFAULT_META_GRAPH_VERSION = 'v25.0'
+DEFAULT_META_SCOPES = 'pages_show_list,pages_read_engagement,pages_manage_posts,instagram_basic,instagram_content_publish,business_management'
 
 
 class SocialHubMetaConfig(models.Model):
@@ -11,14 +17,77 @@ class SocialHubMetaConfig(models.Model):
 
     meta_app_id = fields.Char(string='Meta App ID', required=True)
     meta_app_secret = fields.Char(string='Meta App Secret', required=True)
-    meta_graph_version = fields.Char(string='Meta Graph API Version', default='v25.0', required=True)
+    meta_graph_version = fields.Char(string='Meta Graph API Version', default=DEFAULT_META_GRAPH_VERSION, required=True)
     meta_scopes = fields.Char(
         string='Meta OAuth Scopes',
-        default='pages_show_list,pages_read_engagement,pages_manage_posts,instagram_basic,instagram_content_publish,business_management',
+        default=DEFAULT_META_SCOPES,
         required=True,
     )
+    meta_webhook_verify_token = fields.Char(
+        string='Meta Webhook Verify Token',
+        help='Token Meta echoes back when subscribing the webhook at /social_hub/webhook/meta.',
+    )
 
     _meta_company_unique = models.Constraint(
         'UNIQUE(company_id)',
         'Each company can only have one Meta config record.',
     )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_company_conf(self, company_id):
+        conf = self.sudo().with_context(active_test=True).search([('company_id', '=', company_id)], limit=1)
+        if not conf:
+            return {
+                'app_id': '',
+                'app_secret': '',
+                'version': DEFAULT_META_GRAPH_VERSION,
+                'scopes': DEFAULT_META_SCOPES,
+            }
+        return {
+            'app_id': conf.meta_app_id or '',
+            'app_secret': conf.meta_app_secret or '',
+            'version': conf.meta_graph_version or DEFAULT_META_GRAPH_VERSION,
+            'scopes': conf.meta_scopes or DEFAULT_META_SCOPES,
+        }
+
+    @api.model
+    @tools.ormcache()
+    def _get_webhook_credentials(self):
+        configs = self.sudo().with_context(active_test=True).search([])
+        return (
+            tuple(config.meta_app_secret for config in configs if config.meta_app_secret),
+            tuple(config.meta_webhook_verify_token for config in configs if config.meta_webhook_verify_token),
+        )
+
+    @api.model
+    def _check_webhook_verify_token(self, token):
+        verify_tokens = self._get_webhook_credentials()[1]
+        return bool(token) and any(hmac.compare_digest(token, verify_token) for verify_token in verify_tokens)
+
+    @api.model
+    def _check_webhook_signature(self, body, signature):
+        if not signature or not signature.startswith('sha256='):
+            return False
+        signature = signature[len('sha256='):]
+        for app_secret in self._get_webhook_credentials()[0]:
+            expected = hmac.new(app_secret.encode(), body, hashlib.sha256).hexdigest()
+            if hmac.compare_digest(expected, signature):
+                return True
+        return False
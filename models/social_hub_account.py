@@ -1,17 +1,22 @@
+import logging
 import secrets
+from collections import defaultdict
 from datetime import timedelta
 from urllib.parse import urlencode
 
-import requests
-
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 
+_logger = logging.getLogger(__name__)
+
+META_PAGES_PAGE_SIZE = 100
+META_PAGES_FIELDS = 'id,name,access_token,link,instagram_business_account{id,username,name,profile_picture_url}'
+
 
 class SocialHubAccount(models.Model):
     _name = 'social.hub.account'
     _description = 'Social Hub Account'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'social.hub.worker.mixin']
     _order = 'platform_id, name'
 
     name = fields.Char(required=True, tracking=True)
@@ -36,8 +41,23 @@ class SocialHubAccount(models.Model):
     oauth_provider = fields.Selection([
         ('meta', 'Meta'),
     ], groups='social_hub.group_social_hub_manager')
-    oauth_state = fields.Char(groups='social_hub.group_social_hub_manager')
+    oauth_state = fields.Char(index='btree_not_null', groups='social_hub.group_social_hub_manager')
     oauth_state_expires_at = fields.Datetime(groups='social_hub.group_social_hub_manager')
+    oauth_code = fields.Char(copy=False, groups='social_hub.group_social_hub_manager')
+    connect_status = fields.Selection(
+        [
+            ('pending', 'Waiting'),
+            ('exchanging', 'Exchanging Token'),
+            ('syncing', 'Syncing Assets'),
+            ('done', 'Connected'),
+            ('error', 'Failed'),
+        ],
+        readonly=True,
+        copy=False,
+    )
+    connect_message = fields.Text(readonly=True, copy=False)
+    connect_requested_at = fields.Datetime(readonly=True, copy=False)
+    connect_claimed_at = fields.Datetime(readonly=True, copy=False, help='When a connection job picked up this account.')
 
     company_id = fields.Many2one(
         'res.company',
@@ -48,6 +68,10 @@ class SocialHubAccount(models.Model):
     note = fields.Text()
     last_sync_at = fields.Datetime(readonly=True)
 
+    publish_parked = fields.Boolean(readonly=True, copy=False, help='Queued posts of this account are skipped until its token is fixed.')
+    publish_parked_reason = fields.Text(readonly=True, copy=False)
+    publish_parked_at = fields.Datetime(readonly=True, copy=False)
+
     stream_ids = fields.One2many('social.hub.stream', 'account_id')
     stream_count = fields.Integer(compute='_compute_stream_count')
 
@@ -55,6 +79,8 @@ class SocialHubAccount(models.Model):
         'UNIQUE(platform_id, handle, company_id)',
         'This handle already exists for this platform and company.',
     )
+    _connect_pending_idx = models.Index("(connect_requested_at, id) WHERE connect_status = 'pending'")
+    _connect_claimed_idx = models.Index("(connect_claimed_at) WHERE connect_status IN ('exchanging', 'syncing')")
 
     def _compute_stream_count(self):
         for account in self:
@@ -66,6 +92,26 @@ class SocialHubAccount(models.Model):
             if not record.handle or len(record.handle.strip()) < 2:
                 raise ValidationError(_('Handle must be at least 2 characters.'))
 
+    def write(self, vals):
+        if 'publish_parked' not in vals and {'access_token', 'meta_user_access_token'} & set(vals):
+            vals = dict(vals, publish_parked=False, publish_parked_reason=False, publish_parked_at=False)
+        return super().write(vals)
+
+    def _park_publishing(self, reason):
+        to_park = self.filtered(lambda account: not account.publish_parked)
+        if not to_park:
+            return
+        to_park.sudo().write({
+            'publish_parked': True,
+            'publish_parked_reason': reason,
+            'publish_parked_at': fields.Datetime.now(),
+        })
+        for account in to_park:
+            account.message_post(body=_('Publishing parked after an account-level error: %s') % reason)
+
+    def action_unpark_publishing(self):
+        self.write({'publish_parked': False, 'publish_parked_reason': False, 'publish_parked_at': False})
+
     def action_mark_connected(self):
         self.write({'state': 'connected', 'last_sync_at': fields.Datetime.now()})
 
@@ -112,33 +158,45 @@ class SocialHubAccount(models.Model):
         if not user_token:
             raise UserError(_('No token found. Please connect Meta OAuth first.'))
 
-        self._meta_sync_from_user_access_token(user_token)
+        if not self._meta_sync_from_user_access_token(user_token):
+            return self._meta_asset_lost_notification()
+
+    def action_discover_meta_assets(self):
+        self.ensure_one()
+        if self.platform_code not in ('facebook', 'instagram'):
+            raise UserError(_('Meta discovery is only available for Facebook and Instagram accounts.'))
+
+        user_token = self.meta_user_access_token or self.access_token
+        if not user_token:
+            raise UserError(_('No token found. Please connect Meta OAuth first.'))
+
+        pages = self._meta_fetch_user_pages(user_token)
+        if not self.external_uid:
+            self._meta_apply_user_pages(pages, user_token)
+        accounts = self._meta_upsert_discovered_accounts(pages, user_token)
+        self.message_post(body=_('Meta discovery found %(pages)s pages and synced %(accounts)s accounts.', pages=len(pages), accounts=len(accounts)))
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Discovered Accounts'),
+            'res_model': 'social.hub.account',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', accounts.ids)],
+        }
 
     def action_refresh_meta_token(self):
+        lost = self.browse()
         for account in self:
             if account.platform_code not in ('facebook', 'instagram'):
                 continue
             account._meta_refresh_user_access_token(force=True)
-            account._meta_sync_from_user_access_token(account.meta_user_access_token or account.access_token)
+            if not account._meta_sync_from_user_access_token(account.meta_user_access_token or account.access_token):
+                lost |= account
+        if lost:
+            return lost._meta_asset_lost_notification()
 
     def _get_meta_conf(self):
-        conf = self.env['social.hub.meta.config'].sudo().search(
-            [('company_id', '=', self.company_id.id if self else self.env.company.id)],
-            limit=1,
-        )
-        if not conf:
-            return {
-                'app_id': '',
-                'app_secret': '',
-                'version': 'v25.0',
-                'scopes': 'pages_show_list,pages_read_engagement,pages_manage_posts,instagram_basic,instagram_content_publish,business_management',
-            }
-        return {
-            'app_id': conf.meta_app_id or '',
-            'app_secret': conf.meta_app_secret or '',
-            'version': conf.meta_graph_version or 'v25.0',
-            'scopes': conf.meta_scopes or 'pages_show_list,pages_read_engagement,pages_manage_posts,instagram_basic,instagram_content_publish,business_management',
-        }
+        company_id = self.company_id.id if self else self.env.company.id
+        return dict(self.env['social.hub.meta.config']._get_company_conf(company_id))
 
     def _meta_redirect_uri(self):
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
@@ -146,7 +204,14 @@ class SocialHubAccount(models.Model):
 
     def _meta_graph_base(self):
         conf = self._get_meta_conf()
-        return f"https://graph.facebook.com/{conf['version']}"
+        base_url = self.env['ir.config_parameter'].sudo().get_param('social_hub.graph_base_url') or 'https://graph.facebook.com'
+        return f"{base_url.rstrip('/')}/{conf['version']}"
+
+    def _meta_graph(self):
+        return self.env['social.hub.meta.graph'].with_context(
+            social_hub_app_id=self._get_meta_conf()['app_id'],
+            social_hub_object_id=self.external_uid if len(self) == 1 else False,
+        )
 
     def _meta_exchange_and_sync(self, code):
         self.ensure_one()
@@ -154,7 +219,7 @@ class SocialHubAccount(models.Model):
         if not conf['app_id'] or not conf['app_secret']:
             raise UserError(_('Meta App ID / App Secret are required in settings.'))
 
-        token_resp = requests.get(
+        token_data = self._meta_graph()._get(
             f"{self._meta_graph_base()}/oauth/access_token",
             params={
                 'client_id': conf['app_id'],
@@ -162,11 +227,8 @@ class SocialHubAccount(models.Model):
                 'redirect_uri': self._meta_redirect_uri(),
                 'code': code,
             },
-            timeout=30,
+            error_message=_('Meta token exchange failed: %s'),
         )
-        token_data = token_resp.json()
-        if token_resp.status_code >= 400 or token_data.get('error'):
-            raise UserError(_('Meta token exchange failed: %s') % token_data)
 
         short_token = token_data.get('access_token')
         expires_in = int(token_data.get('expires_in') or 0)
@@ -181,7 +243,83 @@ class SocialHubAccount(models.Model):
         })
 
         self._meta_refresh_user_access_token(force=True)
-        self._meta_sync_from_user_access_token(self.meta_user_access_token or short_token)
+        self._set_connect_status('syncing')
+        if not self._meta_sync_from_user_access_token(self.meta_user_access_token or short_token):
+            raise UserError(self._meta_asset_lost_message())
+
+    def _set_connect_status(self, status, message=False):
+        if not self.connect_status:
+            return
+        self.write({'connect_status': status, 'connect_message': message})
+        if self.env.context.get('social_hub_connect_job'):
+            self.env.cr.commit()
+
+    def _meta_queue_connect(self, code):
+        self.ensure_one()
+        self.write({
+            'oauth_code': code,
+            'oauth_state': False,
+            'oauth_state_expires_at': False,
+            'connect_status': 'pending',
+            'connect_message': False,
+            'connect_requested_at': fields.Datetime.now(),
+            'connect_claimed_at': False,
+        })
+        cron = self.env.ref('social_hub.ir_cron_social_hub_meta_connect', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _claim_pending_connections(self, limit):
+        self.env['social.hub.account'].flush_model(['connect_status', 'connect_requested_at', 'connect_claimed_at'])
+        timeout_minutes = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.connect_timeout_minutes', 15)))
+        now = fields.Datetime.now()
+        self.env.cr.execute("""
+            UPDATE social_hub_account
+               SET connect_status = 'exchanging',
+                   connect_claimed_at = %(now)s
+             WHERE id IN (
+                    SELECT id
+                      FROM social_hub_account
+                     WHERE connect_status = 'pending'
+                        OR (connect_status IN ('exchanging', 'syncing')
+                            AND (connect_claimed_at < %(stale_before)s OR connect_claimed_at IS NULL))
+                  ORDER BY connect_requested_at, id
+                     LIMIT %(limit)s
+                       FOR UPDATE SKIP LOCKED
+             )
+         RETURNING id
+        """, {'now': now, 'stale_before': now - timedelta(minutes=timeout_minutes), 'limit': limit})
+        account_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.env['social.hub.account'].invalidate_model(['connect_status', 'connect_claimed_at'])
+        return self.browse(sorted(account_ids))
+
+    @api.model
+    def cron_process_meta_connections(self, limit=20):
+        accounts = self.sudo()._claim_pending_connections(limit)
+        self.env.cr.commit()
+        for account_id in accounts.ids:
+            account = self.sudo().with_context(social_hub_connect_job=True).browse(account_id)
+            code = account.oauth_code
+            try:
+                account._meta_exchange_and_sync(code)
+                account.write({'oauth_code': False, 'connect_status': 'done', 'connect_message': False})
+                account.message_post(body=_('Meta OAuth connected successfully.'))
+                self.env.cr.commit()
+            except Exception as exc:
+                _logger.warning('Social Hub Meta connection of account %s failed: %s', account_id, exc)
+                self.env.cr.rollback()
+                account.write({
+                    'oauth_code': False,
+                    'connect_status': 'error',
+                    'connect_message': str(exc),
+                    'state': 'disconnected',
+                })
+                account.message_post(body=_('Meta OAuth sync failed: %s') % exc)
+                self.env.cr.commit()
+        self.env['social.hub.rate.limit']._flush_observations()
+        if len(accounts) >= limit:
+            self.env.ref('social_hub.ir_cron_social_hub_meta_connect').sudo()._trigger()
 
     def _meta_refresh_user_access_token(self, force=False):
         self.ensure_one()
@@ -198,7 +336,7 @@ class SocialHubAccount(models.Model):
         if not conf['app_id'] or not conf['app_secret']:
             raise UserError(_('Meta App ID / App Secret are required in settings.'))
 
-        refresh_resp = requests.get(
+        refresh_data = self._meta_graph()._get(
             f"{self._meta_graph_base()}/oauth/access_token",
             params={
                 'grant_type': 'fb_exchange_token',
@@ -206,11 +344,8 @@ class SocialHubAccount(models.Model):
                 'client_secret': conf['app_secret'],
                 'fb_exchange_token': self.meta_user_access_token,
             },
-            timeout=30,
+            error_message=_('Meta token refresh failed: %s'),
         )
-        refresh_data = refresh_resp.json()
-        if refresh_resp.status_code >= 400 or refresh_data.get('error'):
-            raise UserError(_('Meta token refresh failed: %s') % refresh_data)
 
         new_token = refresh_data.get('access_token')
         expires_in = int(refresh_data.get('expires_in') or 0)
@@ -226,58 +361,98 @@ class SocialHubAccount(models.Model):
 
     def _meta_sync_from_user_access_token(self, user_access_token):
         self.ensure_one()
+        pages = self._meta_fetch_user_pages(user_access_token)
+        return self._meta_apply_user_pages(pages, user_access_token)
+
+    def _meta_fetch_user_pages(self, user_access_token):
+        graph = self._meta_graph()
         graph_base = self._meta_graph_base()
 
-        me_resp = requests.get(
+        graph._get(
             f"{graph_base}/me",
             params={'fields': 'id,name', 'access_token': user_access_token},
-            timeout=30,
+            error_message=_('Meta /me failed: %s'),
         )
-        me_data = me_resp.json()
-        if me_resp.status_code >= 400 or me_data.get('error'):
-            raise UserError(_('Meta /me failed: %s') % me_data)
 
-        pages_resp = requests.get(
-            f"{graph_base}/me/accounts",
-            params={
-                'fields': 'id,name,access_token,link,instagram_business_account{id,username,name,profile_picture_url}',
-                'access_token': user_access_token,
-            },
-            timeout=30,
-        )
-        pages_data = pages_resp.json()
-        if pages_resp.status_code >= 400 or pages_data.get('error'):
-            raise UserError(_('Meta /me/accounts failed: %s') % pages_data)
+        pages = []
+        next_url = f"{graph_base}/me/accounts"
+        params = {
+            'fields': META_PAGES_FIELDS,
+            'limit': META_PAGES_PAGE_SIZE,
+            'access_token': user_access_token,
+        }
+        while next_url:
+            pages_data = graph._get(next_url, params=params, error_message=_('Meta /me/accounts failed: %s'))
+            pages.extend(pages_data.get('data') or [])
+            next_url = (pages_data.get('paging') or {}).get('next')
+            params = None
 
-        pages = pages_data.get('data') or []
         if not pages:
             raise UserError(_('No Facebook Pages available for this user token.'))
+        return pages
+
+    def _meta_asset_lost_message(self):
+        return _(
+            '%(asset)s is no longer accessible with this Meta token. Reconnect the account to grant access again.',
+            asset=', '.join(self.mapped('external_uid')),
+        )
+
+    def _meta_mark_asset_lost(self):
+        self.ensure_one()
+        self._queue_write({'state': 'disconnected'})
+        self._log_note(self._meta_asset_lost_message())
+        return False
+
+    def _meta_asset_lost_notification(self):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Meta account disconnected'),
+                'message': self._meta_asset_lost_message(),
+                'type': 'warning',
+                'sticky': True,
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+    def _meta_apply_user_pages(self, pages, user_access_token):
+        self.ensure_one()
+        graph = self._meta_graph()
+        graph_base = self._meta_graph_base()
 
         if self.platform_code == 'facebook':
-            page = pages[0]
+            if self.external_uid:
+                page = next((page for page in pages if page.get('id') == self.external_uid), False)
+                if not page:
+                    return self._meta_mark_asset_lost()
+            else:
+                page = pages[0]
             page_name = page.get('name') or self.name
             page_token = page.get('access_token') or user_access_token
             page_id = page.get('id')
             page_link = page.get('link') or (f'https://www.facebook.com/{page_id}' if page_id else False)
-            self.write({
+            self._write_synced_vals({
                 'name': page_name,
                 'handle': self.handle if self.handle else page_name,
                 'external_uid': page_id,
                 'profile_url': page_link,
                 'access_token': page_token,
                 'state': 'connected',
-                'last_sync_at': fields.Datetime.now(),
             })
-            return
+            return True
 
-        ig_target = False
-        source_page = False
-        for page in pages:
-            ig = page.get('instagram_business_account')
-            if ig:
-                ig_target = ig
-                source_page = page
-                break
+        ig_pages = [page for page in pages if page.get('instagram_business_account')]
+        if self.external_uid:
+            source_page = next(
+                (page for page in ig_pages if page['instagram_business_account'].get('id') == self.external_uid),
+                False,
+            )
+            if not source_page:
+                return self._meta_mark_asset_lost()
+        else:
+            source_page = ig_pages[0] if ig_pages else False
+        ig_target = source_page and source_page['instagram_business_account']
 
         if not ig_target:
             raise UserError(_('No Instagram Business account found in accessible Facebook Pages.'))
@@ -288,42 +463,164 @@ class SocialHubAccount(models.Model):
         ig_picture = ig_target.get('profile_picture_url')
 
         if ig_id and (not ig_username or not ig_name):
-            ig_resp = requests.get(
+            ig_data = graph._get(
                 f"{graph_base}/{ig_id}",
                 params={
                     'fields': 'id,username,name,profile_picture_url',
                     'access_token': source_page.get('access_token') or user_access_token,
                 },
-                timeout=30,
             )
-            ig_data = ig_resp.json()
-            if ig_resp.status_code < 400 and not ig_data.get('error'):
+            if not ig_data.get('error'):
                 ig_username = ig_data.get('username') or ig_username
                 ig_name = ig_data.get('name') or ig_name
                 ig_picture = ig_data.get('profile_picture_url') or ig_picture
 
-        self.write({
+        self._write_synced_vals({
             'name': ig_name or self.name,
             'handle': ig_username or self.handle,
             'external_uid': ig_id,
             'profile_url': f'https://www.instagram.com/{ig_username}/' if ig_username else ig_picture,
             'access_token': source_page.get('access_token') or user_access_token,
             'state': 'connected',
-            'last_sync_at': fields.Datetime.now(),
         })
+        return True
+
+    def _get_changed_vals(self, vals):
+        self.ensure_one()
+        changed = {}
+        for name, value in vals.items():
+            current = self[name]
+            if self._fields[name].type == 'many2one':
+                current = current.id
+            if (current or False) != (value or False):
+                changed[name] = value
+        return changed
+
+    def _write_synced_vals(self, vals):
+        self.ensure_one()
+        changed = self._get_changed_vals(vals)
+        changed['last_sync_at'] = fields.Datetime.now()
+        self._queue_write(changed)
+
+    def _meta_discovered_vals(self, pages, user_access_token):
+        platforms = {
+            platform.code: platform
+            for platform in self.env['social.hub.platform'].search([('code', 'in', ['facebook', 'instagram'])])
+        }
+        shared_vals = {
+            'meta_user_access_token': user_access_token,
+            'meta_user_token_expires_at': self.meta_user_token_expires_at,
+            'oauth_provider': 'meta',
+            'state': 'connected',
+        }
+        discovered = {}
+        for page in pages:
+            page_id = page.get('id')
+            if page_id and 'facebook' in platforms:
+                discovered[(platforms['facebook'].id, page_id)] = dict(
+                    shared_vals,
+                    name=page.get('name') or page_id,
+                    profile_url=page.get('link') or f'https://www.facebook.com/{page_id}',
+                    access_token=page.get('access_token') or user_access_token,
+                )
+            ig = page.get('instagram_business_account') or {}
+            if ig.get('id') and 'instagram' in platforms:
+                ig_username = ig.get('username')
+                discovered[(platforms['instagram'].id, ig['id'])] = dict(
+                    shared_vals,
+                    name=ig.get('name') or ig_username or ig['id'],
+                    profile_url=f'https://www.instagram.com/{ig_username}/' if ig_username else ig.get('profile_picture_url'),
+                    access_token=page.get('access_token') or user_access_token,
+                    handle=ig_username,
+                )
+        return discovered
+
+    def _meta_upsert_discovered_accounts(self, pages, user_access_token):
+        self.ensure_one()
+        discovered = self._meta_discovered_vals(pages, user_access_token)
+        if not discovered:
+            return self.browse()
+
+        accounts = self.with_context(active_test=False, mail_create_nolog=True, tracking_disable=True)
+        company_id = self.company_id.id
+        existing = accounts.search([
+            ('platform_id', 'in', list({platform_id for platform_id, uid in discovered})),
+            ('external_uid', 'in', [uid for platform_id, uid in discovered]),
+            ('company_id', '=', company_id),
+        ])
+        existing_by_key = {(account.platform_id.id, account.external_uid): account for account in existing}
+        used_handles = {
+            (row['platform_id'][0], row['handle'])
+            for row in accounts.search_read(
+                [('platform_id', 'in', list({platform_id for platform_id, uid in discovered})), ('company_id', '=', company_id)],
+                ['platform_id', 'handle'],
+            )
+        }
+
+        touched = self.browse()
+        create_vals = []
+        for (platform_id, external_uid), vals in discovered.items():
+            account = existing_by_key.get((platform_id, external_uid))
+            if account:
+                changed = account._get_changed_vals({key: value for key, value in vals.items() if key != 'handle'})
+                if changed:
+                    account.write(changed)
+                touched |= account
+                continue
+            handle = vals.get('handle') or vals['name']
+            if (platform_id, handle) in used_handles:
+                handle = f'{handle} ({external_uid})'
+            used_handles.add((platform_id, handle))
+            create_vals.append(dict(
+                vals,
+                platform_id=platform_id,
+                external_uid=external_uid,
+                company_id=company_id,
+                handle=handle,
+            ))
+
+        if create_vals:
+            touched |= accounts.create(create_vals)
+        touched.write({'last_sync_at': fields.Datetime.now()})
+        return touched
+
+    def _meta_refresh_token_group(self):
+        lead = self.sorted(lambda account: account.meta_user_token_expires_at or fields.Datetime.now())[:1]
+        try:
+            refreshed = lead._meta_refresh_user_access_token(force=False)
+            if not refreshed:
+                return
+            user_token = lead.meta_user_access_token
+            (self - lead)._queue_write({
+                'meta_user_access_token': user_token,
+                'meta_user_token_expires_at': lead.meta_user_token_expires_at,
+                'meta_last_refresh_at': lead.meta_last_refresh_at,
+            })
+            pages = lead._meta_fetch_user_pages(user_token)
+        except Exception as exc:
+            self._log_note(f'Automatic Meta token refresh failed: {exc}')
+            return
+
+        for account in self:
+            try:
+                if account._meta_apply_user_pages(pages, user_token):
+                    account._log_note('Meta token refreshed automatically.')
+            except Exception as exc:
+                account._log_note(f'Automatic Meta token refresh failed: {exc}')
 
     @api.model
     def cron_refresh_meta_tokens(self):
+        run_start = self.env['social.hub.cron.run']._start()
         accounts = self.sudo().search([
             ('platform_code', 'in', ['facebook', 'instagram']),
             ('state', '=', 'connected'),
             ('meta_user_access_token', '!=', False),
         ])
+        groups = defaultdict(list)
         for account in accounts:
-            try:
-                refreshed = account._meta_refresh_user_access_token(force=False)
-                if refreshed:
-                    account._meta_sync_from_user_access_token(account.meta_user_access_token)
-                    account.message_post(body='Meta token refreshed automatically.')
-            except Exception as exc:
-                account.message_post(body=f'Automatic Meta token refresh failed: {exc}')
+            groups[(account.company_id.id, account.meta_user_access_token)].append(account.id)
+
+        max_workers = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.token_refresh_workers', 4)))
+        accounts._run_in_worker_pool(list(groups.values()), '_meta_refresh_token_group', max_workers=max_workers)
+        self.env['social.hub.rate.limit']._flush_observations()
+        self.env['social.hub.cron.run']._record('refresh_meta_tokens', run_start, batch_size=len(accounts))
@@ -0,0 +1,131 @@
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class SocialHubCampaign(models.Model):
+    _name = 'social.hub.campaign'
+    _description = 'Social Hub Campaign'
+    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _order = 'id desc'
+
+    name = fields.Char(required=True, tracking=True)
+    active = fields.Boolean(default=True)
+    company_id = fields.Many2one('res.company', default=lambda self: self.env.company, required=True)
+    state = fields.Selection(
+        [('draft', 'Draft'), ('launched', 'Launched'), ('canceled', 'Canceled')],
+        default='draft',
+        required=True,
+        tracking=True,
+    )
+
+    account_ids = fields.Many2many(
+        'social.hub.account',
+        string='Accounts',
+        domain="[('platform_code', 'in', ['facebook', 'instagram']), ('state', '=', 'connected')]",
+    )
+    media_type = fields.Selection(
+        [('text', 'Text'), ('image', 'Image'), ('video', 'Video')],
+        default='image',
+        required=True,
+    )
+    message = fields.Text(required=True)
+    image_url = fields.Char()
+    video_url = fields.Char()
+    scheduled_at = fields.Datetime()
+    max_attempts = fields.Integer(default=3)
+    retry_interval_minutes = fields.Integer(default=10)
+
+    media_prepared_at = fields.Datetime(readonly=True, copy=False)
+
+    post_ids = fields.One2many('social.hub.post', 'campaign_id')
+    post_count = fields.Integer(compute='_compute_post_stats')
+    posted_count = fields.Integer(compute='_compute_post_stats')
+    failed_count = fields.Integer(compute='_compute_post_stats')
+
+    def _compute_post_stats(self):
+        stats = {
+            (campaign, state): count
+            for campaign, state, count in self.env['social.hub.post']._read_group(
+                [('campaign_id', 'in', self.ids)], ['campaign_id', 'state'], ['__count'],
+            )
+        }
+        for campaign in self:
+            campaign.post_count = sum(count for (record, state), count in stats.items() if record == campaign)
+            campaign.posted_count = stats.get((campaign, 'posted'), 0)
+            campaign.failed_count = stats.get((campaign, 'failed'), 0)
+
+    def _media_url(self):
+        self.ensure_one()
+        if self.media_type == 'image':
+            return self.image_url
+        if self.media_type == 'video':
+            return self.video_url
+        return False
+
+    def _prepare_media(self):
+        self.ensure_one()
+        media_url = self._media_url()
+        if not media_url:
+            return False
+        check = self.env['social.hub.media.check'].sudo()._get_checks([media_url]).get(media_url)
+        if check and check.state not in ('ok', 'pending'):
+            raise UserError('\n'.join(check._validation_errors(False, self.media_type)))
+        self.media_prepared_at = fields.Datetime.now()
+        return media_url
+
+    def action_launch(self):
+        posts = self.env['social.hub.post']
+        for campaign in self:
+            if campaign.state != 'draft':
+                raise UserError(_('Only draft campaigns can be launched.'))
+            if not campaign.account_ids:
+                raise UserError(_('Select at least one account.'))
+
+            media_url = campaign._prepare_media()
+            rows = []
+            for account in campaign.account_ids:
+                rows.append({
+                    'name': f'{campaign.name} - {account.name}',
+                    'account_id': account.id,
+                    'message': campaign.message,
+                    'media_type': campaign.media_type,
+                    'image_url': media_url if campaign.media_type == 'image' else False,
+                    'video_url': media_url if campaign.media_type == 'video' else False,
+                    'scheduled_at': campaign.scheduled_at,
+                    'max_attempts': campaign.max_attempts,
+                    'retry_interval_minutes': campaign.retry_interval_minutes,
+                    'campaign_id': campaign.id,
+                })
+            results = posts.enqueue_bulk(rows)
+            queued = posts.browse([result['id'] for result in results if result['id']])
+
+            rejected = [
+                f"{campaign.account_ids[result['index']].display_name}: {'; '.join(result['errors'])}"
+                for result in results if result['status'] == 'rejected'
+            ]
+            if not queued:
+                raise UserError(_('No post could be queued:\n%s') % '\n'.join(rejected))
+            campaign.state = 'launched'
+            body = _('Campaign launched: %s posts queued.') % len(queued)
+            if rejected:
+                body += '\n' + _('Skipped: %s') % ', '.join(rejected)
+            campaign.message_post(body=body)
+
+    def action_cancel(self):
+        self.post_ids.filtered(lambda post: post.state in ('draft', 'queued', 'failed')).action_cancel()
+        self.write({'state': 'canceled'})
+
+    def action_view_posts(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Campaign Posts'),
+            'res_model': 'social.hub.post',
+            'view_mode': 'list,form',
+            'domain': [('campaign_id', '=', self.id)],
+        }
+
+    @api.ondelete(at_uninstall=False)
+    def _unlink_except_launched(self):
+        if any(campaign.state == 'launched' for campaign in self):
+            raise UserError(_('Launched campaigns cannot be deleted. Cancel or archive them instead.'))
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .social_hub_metrics import inc_counter, observe_histogram
+
+CRON_SELECTION = [
+    ('publish_queue', 'Publish Queue'),
+    ('poll_ig_containers', 'Instagram Containers'),
+    ('resolve_permalinks', 'Permalinks'),
+    ('collect_insights', 'Insights'),
+    ('refresh_streams', 'Streams'),
+    ('webhook_inbox', 'Webhook Inbox'),
+    ('refresh_meta_tokens', 'Meta Tokens'),
+]
+
+
+class SocialHubCronRun(models.Model):
+    _name = 'social.hub.cron.run'
+    _description = 'Social Hub Cron Run'
+    _order = 'started_at desc, id desc'
+    _log_access = False
+
+    cron = fields.Selection(CRON_SELECTION, required=True, readonly=True)
+    started_at = fields.Datetime(required=True, readonly=True, index=True)
+    duration_ms = fields.Integer(readonly=True, aggregator='avg')
+    batch_size = fields.Integer(readonly=True)
+    success_count = fields.Integer(readonly=True)
+    failure_count = fields.Integer(readonly=True)
+    lag_seconds = fields.Float(readonly=True, aggregator='max', help='Age of the oldest due item when the run started.')
+
+    _cron_started_idx = models.Index('(cron, started_at DESC, id DESC)')
+
+    @api.model
+    def _start(self):
+        return fields.Datetime.now(), time.monotonic()
+
+    @api.model
+    def _record(self, cron, start, batch_size=0, success_count=0, failure_count=0, lag_seconds=0.0):
+        started_at, started = start
+        duration = time.monotonic() - started
+        inc_counter('social_hub_cron_runs_total', {'cron': cron})
+        inc_counter('social_hub_cron_items_total', {'cron': cron, 'outcome': 'success'}, success_count)
+        inc_counter('social_hub_cron_items_total', {'cron': cron, 'outcome': 'failure'}, failure_count)
+        observe_histogram('social_hub_cron_seconds', {'cron': cron}, duration)
+        self.env['social.hub.metric.value'].sudo()._flush()
+        return self.sudo().create({
+            'cron': cron,
+            'started_at': started_at,
+            'duration_ms': int(duration * 1000),
+            'batch_size': batch_size,
+            'success_count': success_count,
+            'failure_count': failure_count,
+            'lag_seconds': lag_seconds,
+        })
+
+    @api.model
+    def _latest_by_cron(self):
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (cron) cron, duration_ms, batch_size, success_count, failure_count, lag_seconds
+              FROM social_hub_cron_run
+          ORDER BY cron, started_at DESC, id DESC
+        """)
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def _prometheus_gauges(self):
+        gauges = []
+        for row in self._latest_by_cron():
+            labels = {'cron': row['cron']}
+            gauges += [
+                ('social_hub_cron_last_duration_seconds', labels, row['duration_ms'] / 1000.0),
+                ('social_hub_cron_last_batch_size', labels, row['batch_size']),
+                ('social_hub_cron_last_failures', labels, row['failure_count']),
+                ('social_hub_cron_last_lag_seconds', labels, row['lag_seconds']),
+            ]
+
+        stats = self.env['social.hub.post'].sudo().get_queue_stats()
+        for key in ('pending', 'due', 'processing', 'expired_leases', 'container_pending', 'lag_seconds'):
+            gauges.append((f'social_hub_publish_queue_{key}', None, stats[key]))
+
+        for limit in self.env['social.hub.rate.limit'].sudo().search([]):
+            gauges.append(('social_hub_rate_limit_usage_pct', {'key': limit.key}, limit.usage_pct))
+        return gauges
+
+    @api.model
+    def cron_purge(self):
+        retention_days = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.cron_run_retention_days', 14)))
+        self.env.cr.execute(
+            'DELETE FROM social_hub_cron_run WHERE started_at < %s',
+            (fields.Datetime.now() - timedelta(days=retention_days),),
+        )
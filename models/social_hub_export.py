@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+EXPORT_DATASETS = {
+    'posts': {
+        'model': 'social.hub.post',
+        'fields': [
+            'name', 'company_id', 'platform_id', 'account_id', 'campaign_id', 'state', 'media_type',
+            'scheduled_at', 'posted_at', 'attempt_count', 'throttle_count', 'external_post_id',
+            'external_permalink', 'last_error',
+        ],
+        'filters': {
+            'company': 'company_id',
+            'platform': 'platform_id',
+            'account': 'account_id',
+            'state': 'state',
+            'date': 'create_date',
+        },
+    },
+    'attempts': {
+        'model': 'social.hub.publish.attempt',
+        'fields': ['post_id', 'account_id', 'attempt_no', 'outcome', 'error_message', 'started_at', 'duration_ms'],
+        'filters': {
+            'company': 'post_id.company_id',
+            'platform': 'post_id.platform_id',
+            'account': 'account_id',
+            'state': 'outcome',
+            'date': 'started_at',
+        },
+    },
+    'items': {
+        'model': 'social.hub.stream.item',
+        'fields': [
+            'company_id', 'platform_id', 'account_id', 'stream_id', 'external_id', 'author', 'message',
+            'permalink', 'media_url', 'published_at', 'fetched_at',
+        ],
+        'filters': {
+            'company': 'company_id',
+            'platform': 'platform_id',
+            'account': 'account_id',
+            'date': 'published_at',
+        },
+    },
+}
+
+
+def _parse_ids(value, label):
+    try:
+        return [int(part) for part in str(value).split(',') if part.strip()]
+    except ValueError:
+        raise UserError(_('Invalid %s filter: %s') % (label, value)) from None
+
+
+class SocialHubExport(models.AbstractModel):
+    _name = 'social.hub.export'
+    _description = 'Social Hub Streaming Export'
+
+    @api.model
+    def _export_chunk_size(self):
+        return max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.export_chunk_size', 2000)))
+
+    @api.model
+    def _export_domain(self, dataset, params):
+        spec = EXPORT_DATASETS.get(dataset)
+        if not spec:
+            raise UserError(_('Unknown export dataset: %s') % dataset)
+        self.env[spec['model']].check_access('read')
+        filters = spec['filters']
+
+        allowed_company_ids = self.env.user.company_ids.ids
+        company_ids = _parse_ids(params['company_id'], 'company') if params.get('company_id') else self.env.companies.ids
+        if set(company_ids) - set(allowed_company_ids):
+            raise UserError(_('You cannot export data of companies you do not have access to.'))
+        domain = [(filters['company'], 'in', company_ids + [False])]
+
+        if params.get('platform_id'):
+            domain.append((filters['platform'], 'in', _parse_ids(params['platform_id'], 'platform')))
+        if params.get('account_id'):
+            domain.append((filters['account'], 'in', _parse_ids(params['account_id'], 'account')))
+        if params.get('state'):
+            if 'state' not in filters:
+                raise UserError(_('The %s export cannot be filtered by state.') % dataset)
+            domain.append((filters['state'], 'in', [part.strip() for part in params['state'].split(',') if part.strip()]))
+        for key, operator in (('date_from', '>='), ('date_to', '<=')):
+            if params.get(key):
+                try:
+                    value = fields.Datetime.to_datetime(params[key])
+                except ValueError:
+                    raise UserError(_('Invalid %s: %s') % (key, params[key])) from None
+                domain.append((filters['date'], operator, value))
+        return domain
+
+    @api.model
+    def _export_chunk(self, dataset, domain, after_id=0, limit=None):
+        spec = EXPORT_DATASETS[dataset]
+        records = self.env[spec['model']].search_fetch(
+            domain + [('id', '>', after_id)],
+            [name for name in spec['fields'] if self.env[spec['model']]._fields[name].store],
+            order='id',
+            limit=limit or self._export_chunk_size(),
+        )
+        rows = [self._export_row(record, spec['fields']) for record in records]
+        return rows, records[-1:].id or after_id
+
+    @api.model
+    def _export_row(self, record, field_names):
+        row = {'id': record.id}
+        for name in field_names:
+            field = record._fields[name]
+            value = record[name]
+            if field.type == 'many2one':
+                row[name] = value.id or None
+                row[f'{name}_name'] = value.display_name if value else None
+            elif field.type == 'datetime':
+                row[name] = fields.Datetime.to_string(value) if value else None
+            else:
+                row[name] = value if value is not False or field.type == 'boolean' else None
+        return row
+
+    @api.model
+    def _export_columns(self, dataset):
+        columns = ['id']
+        for name in EXPORT_DATASETS[dataset]['fields']:
+            columns.append(name)
+            if self.env[EXPORT_DATASETS[dataset]['model']]._fields[name].type == 'many2one':
+                columns.append(f'{name}_name')
+        return columns
+
+    @api.model
+    def _export_encode(self, rows, export_format, columns=None, header=False):
+        if export_format == 'ndjson':
+            return ''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
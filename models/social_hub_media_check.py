@@ -0,0 +1,374 @@
+import hashlib
+import ipaddress
+import os
+import re
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from odoo import api, fields, models, _
+from odoo.tools import str2bool
+
+MEDIA_CHECK_TIMEOUT = 10
+MEDIA_MAX_REDIRECTS = 5
+MEDIA_POOL_SIZE = 16
+MEDIA_PROBE_HEAD_BYTES = 256 * 1024
+MEDIA_PROBE_TAIL_BYTES = 1024 * 1024
+MEDIA_RULES = {
+    ('instagram', 'image'): {
+        'types': ('image/jpeg',),
+        'max_mb': 8,
+        'ratio': (0.8, 1.91),
+        'min_width': 320,
+    },
+    ('instagram', 'video'): {
+        'types': ('video/mp4', 'video/quicktime'),
+        'max_mb': 300,
+        'ratio': (0.01, 10.0),
+        'duration': (3, 900),
+    },
+    ('facebook', 'image'): {
+        'types': ('image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/tiff'),
+        'max_mb': 10,
+    },
+    ('facebook', 'video'): {
+        'types': ('video/mp4', 'video/quicktime', 'video/x-msvideo', 'video/webm', 'video/x-matroska'),
+        'max_mb': 10240,
+        'duration': (1, 14400),
+    },
+}
+CONTENT_RANGE_RE = re.compile(r'/(\d+)$')
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_session_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+class MediaURLBlocked(Exception):
+    pass
+
+
+def get_media_session():
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                session.trust_env = False
+                adapter = HTTPAdapter(pool_connections=MEDIA_POOL_SIZE, pool_maxsize=MEDIA_POOL_SIZE, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+                _session_pid = pid
+    return _session
+
+
+def check_media_url_allowed(url, allow_http=False):
+    parts = urlsplit(url)
+    schemes = ('https', 'http') if allow_http else ('https',)
+    if parts.scheme not in schemes:
+        raise MediaURLBlocked(f'scheme {parts.scheme or "(none)"} is not allowed')
+    if not parts.hostname:
+        raise MediaURLBlocked('URL has no host')
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError) as exc:
+        raise MediaURLBlocked(f'host {parts.hostname} cannot be resolved') from exc
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if not ip.is_global or ip.is_multicast:
+            raise MediaURLBlocked(f'host {parts.hostname} resolves to a non-public address')
+
+
+def _sniff_content_type(data):
+    if data.startswith(b'\xff\xd8'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[4:8] == b'ftyp':
+        return 'video/quicktime' if data[8:10] == b'qt' else 'video/mp4'
+    return None
+
+
+def _image_size(data):
+    if data.startswith(b'\x89PNG\r\n\x1a\n') and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data.startswith(b'\xff\xd8'):
+        index = 2
+        while index + 9 < len(data):
+            if data[index] != 0xFF:
+                return None
+            marker = data[index + 1]
+            if marker == 0xFF:
+                index += 1
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                height, width = struct.unpack('>HH', data[index + 5:index + 9])
+                return width, height
+            if 0xD0 <= marker <= 0xD9 or marker == 0x01:
+                index += 2
+                continue
+            index += 2 + struct.unpack('>H', data[index + 2:index + 4])[0]
+    return None
+
+
+def _mp4_info(data):
+    info = {}
+    index = data.find(b'mvhd')
+    if index >= 0 and index + 36 <= len(data):
+        if data[index + 4] == 1:
+            timescale, duration = struct.unpack('>IQ', data[index + 24:index + 36])
+        else:
+            timescale, duration = struct.unpack('>II', data[index + 16:index + 24])
+        if timescale:
+            info['duration'] = duration / timescale
+
+    index = data.find(b'tkhd')
+    while index >= 0:
+        offset = index + (92 if data[index + 4:index + 5] == b'\x01' else 80)
+        if offset + 8 > len(data):
+            break
+        width, height = struct.unpack('>II', data[offset:offset + 8])
+        if width and height:
+            info['width'], info['height'] = width >> 16, height >> 16
+            break
+        index = data.find(b'tkhd', index + 4)
+    return info
+
+
+def _read_range(url, byte_range, max_bytes, deadline, allow_http=False):
+    for _hop in range(MEDIA_MAX_REDIRECTS + 1):
+        check_media_url_allowed(url, allow_http)
+        timeout = max(0.1, deadline - time.monotonic())
+        resp = get_media_session().get(
+            url, headers={'Range': f'bytes={byte_range}'}, stream=True, allow_redirects=False, timeout=timeout,
+        )
+        if resp.is_redirect:
+            url = urljoin(url, resp.headers['Location'])
+            resp.close()
+            continue
+        try:
+            data = b''
+            if resp.status_code < 400:
+                for chunk in resp.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) >= max_bytes:
+                        break
+                    if time.monotonic() > deadline:
+                        raise requests.Timeout('media download exceeded the preflight timeout')
+            return resp, data
+        finally:
+            resp.close()
+    raise MediaURLBlocked(f'more than {MEDIA_MAX_REDIRECTS} redirects')
+
+
+def probe_media_url(url, timeout=MEDIA_CHECK_TIMEOUT, allow_http=False):
+    started = time.monotonic()
+    deadline = started + timeout
+    result = {'url': url, 'state': 'ok'}
+    try:
+        resp, data = _read_range(url, f'0-{MEDIA_PROBE_HEAD_BYTES - 1}', MEDIA_PROBE_HEAD_BYTES, deadline, allow_http)
+        result['status_code'] = resp.status_code
+        if resp.status_code >= 400:
+            result.update(state='unreachable', error_message=f'HTTP {resp.status_code}')
+            return result
+
+        content_type = (resp.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if not content_type or content_type == 'application/octet-stream':
+            content_type = _sniff_content_type(data) or content_type
+        result['content_type'] = content_type or False
+
+        size = None
+        content_range = CONTENT_RANGE_RE.search(resp.headers.get('Content-Range') or '')
+        if content_range:
+            size = int(content_range.group(1))
+        elif resp.status_code == 200 and resp.headers.get('Content-Length', '').isdigit():
+            size = int(resp.headers['Content-Length'])
+        result['size_mb'] = size / (1024 * 1024) if size is not None else False
+
+        if content_type.startswith('image/'):
+            dimensions = _image_size(data)
+            if dimensions:
+                result['width'], result['height'] = dimensions
+        elif content_type.startswith('video/'):
+            info = _mp4_info(data)
+            if 'duration' not in info and size and size > len(data) and resp.status_code == 206:
+                tail_resp, tail = _read_range(url, f'-{MEDIA_PROBE_TAIL_BYTES}', MEDIA_PROBE_TAIL_BYTES, deadline, allow_http)
+                if tail_resp.status_code == 206:
+                    info = dict(_mp4_info(tail), **info)
+            result.update(info)
+    except MediaURLBlocked as exc:
+        result.update(state='blocked', error_message=str(exc))
+    except requests.RequestException as exc:
+        result.update(state='unreachable', error_message=type(exc).__name__)
+    finally:
+        result['response_ms'] = int((time.monotonic() - started) * 1000)
+    return result
+
+
+class SocialHubMediaCheck(models.Model):
+    _name = 'social.hub.media.check'
+    _description = 'Social Hub Media Preflight Check'
+    _order = 'checked_at desc, id desc'
+    _rec_name = 'url'
+    _log_access = False
+
+    url = fields.Char(required=True, readonly=True)
+    state = fields.Selection(
+        [('pending', 'Not Checked Yet'), ('ok', 'Reachable'), ('unreachable', 'Unreachable'), ('blocked', 'Blocked')],
+        required=True,
+        readonly=True,
+    )
+    status_code = fields.Integer(readonly=True)
+    content_type = fields.Char(readonly=True)
+    size_mb = fields.Float(string='Size (MB)', digits=(16, 2), readonly=True)
+    width = fields.Integer(readonly=True)
+    height = fields.Integer(readonly=True)
+    duration = fields.Float(string='Duration (s)', digits=(16, 1), readonly=True)
+    response_ms = fields.Integer(readonly=True)
+    error_message = fields.Char(readonly=True)
+    checked_at = fields.Datetime(required=True, readonly=True)
+    expires_at = fields.Datetime(required=True, readonly=True, index=True)
+
+    _url_unique = models.UniqueIndex('(md5(url))')
+
+    @api.model
+    def _get_checks(self, urls, probe=True):
+        urls = sorted({url for url in urls if url})
+        if not urls:
+            return {}
+        now = fields.Datetime.now()
+        self.env.cr.execute(
+            'SELECT url, id, state FROM social_hub_media_check WHERE md5(url) = ANY(%s) AND expires_at > %s',
+            ([hashlib.md5(url.encode()).hexdigest() for url in urls], now),
+        )
+        check_ids = {url: check_id for url, check_id, state in self.env.cr.fetchall() if state != 'pending' or not probe}
+        missing = [url for url in urls if url not in check_ids]
+        if missing:
+            check_ids.update(self._refresh_checks(missing, probe=probe))
+        return {url: self.browse(check_ids[url]) for url in urls if url in check_ids}
+
+    @api.model
+    def _refresh_checks(self, urls, probe=True):
+        params = self.env['ir.config_parameter'].sudo()
+        max_workers = max(1, int(params.get_param('social_hub.media_check_workers', 8)))
+        max_probes = max(1, int(params.get_param('social_hub.media_check_max_probes', 20)))
+        ttl_minutes = max(1, int(params.get_param('social_hub.media_check_ttl_minutes', 1440)))
+        error_ttl_minutes = max(1, int(params.get_param('social_hub.media_check_error_ttl_minutes', 10)))
+        allow_http = str2bool(params.get_param('social_hub.media_check_allow_http', 'False'))
+
+        probe_urls = urls[:max_probes] if probe else []
+        if len(probe_urls) == 1:
+            results = [probe_media_url(probe_urls[0], allow_http=allow_http)]
+        elif probe_urls:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(probe_urls)), thread_name_prefix='social_hub_media') as executor:
+                results = list(executor.map(lambda url: probe_media_url(url, allow_http=allow_http), probe_urls))
+        else:
+            results = []
+        results += [{'url': url, 'state': 'pending'} for url in urls[len(probe_urls):]]
+
+        now = fields.Datetime.now()
+        check_ids = {}
+        for result in results:
+            ttl = ttl_minutes if result['state'] in ('ok', 'pending') else error_ttl_minutes
+            self.env.cr.execute("""
+                INSERT INTO social_hub_media_check
+                       (url, state, status_code, content_type, size_mb, width, height, duration,
+                        response_ms, error_message, checked_at, expires_at)
+                VALUES (%(url)s, %(state)s, %(status_code)s, %(content_type)s, %(size_mb)s, %(width)s, %(height)s,
+                        %(duration)s, %(response_ms)s, %(error_message)s, %(checked_at)s, %(expires_at)s)
+                ON CONFLICT (md5(url)) DO UPDATE
+                   SET state = EXCLUDED.state,
+                       status_code = EXCLUDED.status_code,
+                       content_type = EXCLUDED.content_type,
+                       size_mb = EXCLUDED.size_mb,
+                       width = EXCLUDED.width,
+                       height = EXCLUDED.height,
+                       duration = EXCLUDED.duration,
+                       response_ms = EXCLUDED.response_ms,
+                       error_message = EXCLUDED.error_message,
+                       checked_at = EXCLUDED.checked_at,
+                       expires_at = EXCLUDED.expires_at
+                RETURNING id
+            """, {
+                'url': result['url'],
+                'state': result['state'],
+                'status_code': result.get('status_code'),
+                'content_type': result.get('content_type') or None,
+                'size_mb': result.get('size_mb') or None,
+                'width': result.get('width'),
+                'height': result.get('height'),
+                'duration': result.get('duration'),
+                'response_ms': result.get('response_ms'),
+                'error_message': result.get('error_message'),
+                'checked_at': now,
+                'expires_at': now + timedelta(minutes=ttl),
+            })
+            check_ids[result['url']] = self.env.cr.fetchone()[0]
+        self.invalidate_model()
+        if len(results) > len(probe_urls):
+            cron = self.env.ref('social_hub.ir_cron_social_hub_probe_media_checks', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+        return check_ids
+
+    def _validation_errors(self, platform_code, media_type):
+        self.ensure_one()
+        if self.state == 'pending':
+            return []
+        if self.state == 'blocked':
+            return [_('Media URL %(url)s is not allowed: %(reason)s', url=self.url, reason=self.error_message)]
+        if self.state != 'ok':
+            return [_('Media URL %(url)s could not be reached: %(error)s', url=self.url, error=self.error_message or _('unknown error'))]
+
+        errors = []
+        rule = MEDIA_RULES.get((platform_code, media_type), {})
+        content_type = self.content_type or ''
+        if rule.get('types') and content_type and content_type not in rule['types']:
+            errors.append(_('Media type %(type)s is not accepted for %(platform)s %(media)s posts.',
+                            type=content_type, platform=platform_code, media=media_type))
+        elif content_type and not content_type.startswith(f'{media_type}/'):
+            errors.append(_('Media URL serves %(type)s, expected a %(media)s.', type=content_type, media=media_type))
+        if rule.get('max_mb') and self.size_mb and self.size_mb > rule['max_mb']:
+            errors.append(_('Media is %(size).1f MB, the limit is %(limit)s MB.', size=self.size_mb, limit=rule['max_mb']))
+        if rule.get('min_width') and self.width and self.width < rule['min_width']:
+            errors.append(_('Media is %(width)s px wide, at least %(limit)s px are required.', width=self.width, limit=rule['min_width']))
+        if rule.get('ratio') and self.width and self.height:
+            low, high = rule['ratio']
+            ratio = self.width / self.height
+            if not low <= ratio <= high:
+                errors.append(_('Media aspect ratio %(ratio).2f is outside %(low)s–%(high)s.', ratio=ratio, low=low, high=high))
+        if rule.get('duration') and self.duration:
+            low, high = rule['duration']
+            if not low <= self.duration <= high:
+                errors.append(_('Video lasts %(duration).0f s, it must be between %(low)s and %(high)s s.',
+                                duration=self.duration, low=low, high=high))
+        return errors
+
+    @api.model
+    def cron_probe_pending(self):
+        max_probes = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.media_check_max_probes', 20)))
+        pending = self.search([('state', '=', 'pending')], order='checked_at, id', limit=max_probes)
+        if not pending:
+            return
+        self._refresh_checks(pending.mapped('url'))
+        if self.search_count([('state', '=', 'pending')], limit=1):
+            self.env.ref('social_hub.ir_cron_social_hub_probe_media_checks')._trigger()
+
+    @api.model
+    def cron_purge(self):
+        self.env.cr.execute('DELETE FROM social_hub_media_check WHERE expires_at < %s', (fields.Datetime.now(),))
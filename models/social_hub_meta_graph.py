@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from odoo import api, models
+from odoo.exceptions import UserError
+
+from .social_hub_metrics import observe_graph_call
+from .social_hub_rate_limit import THROTTLE_ERROR_CODES, record_throttled, record_usage_headers
+
+GRAPH_TIMEOUT = 30
+GRAPH_PUBLISH_TIMEOUT = 45
+GRAPH_UPLOAD_TIMEOUT = 60
+GRAPH_POOL_SIZE = 32
+GRAPH_BATCH_LIMIT = 50
+
+_session_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+def get_graph_session():
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=GRAPH_POOL_SIZE, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+                _session_pid = pid
+    return _session
+
+
+class MetaGraphError(UserError):
+
+    def __init__(self, message, status_code=None, payload=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.payload = payload if payload is not None else {}
+        error = self.payload.get('error') if isinstance(self.payload, dict) else None
+        self.error = error if isinstance(error, dict) else {}
+        self.code = self.error.get('code')
+        self.subcode = self.error.get('error_subcode')
+
+
+class SocialHubMetaGraph(models.AbstractModel):
+    _name = 'social.hub.meta.graph'
+    _description = 'Social Hub Meta Graph API Client'
+
+    @api.model
+    def _request(self, method, url, params=None, data=None, timeout=GRAPH_TIMEOUT, error_message=None):
+        app_id = self.env.context.get('social_hub_app_id')
+        object_id = self.env.context.get('social_hub_object_id')
+        retry = bool(self.env.context.get('social_hub_retry'))
+        started = time.monotonic()
+        try:
+            resp = get_graph_session().request(method, url, params=params, data=data, timeout=timeout)
+        except requests.RequestException as exc:
+            observe_graph_call(method, url, type(exc).__name__, time.monotonic() - started, retry=retry)
+            payload = {'error': {'message': str(exc), 'type': type(exc).__name__}}
+            if error_message:
+                raise MetaGraphError(error_message % payload, payload=payload) from exc
+            return payload
+
+        observations = record_usage_headers(resp.headers, app_id=app_id, object_id=object_id)
+
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = {'error': {'message': resp.text[:500], 'type': 'InvalidJSON'}}
+
+        if resp.status_code >= 400 and not (isinstance(payload, dict) and payload.get('error')):
+            payload = {'error': {'message': f'HTTP {resp.status_code}', 'type': 'HTTPError'}, 'body': payload}
+
+        error = payload.get('error') if isinstance(payload, dict) else None
+        throttled = isinstance(error, dict) and error.get('code') in THROTTLE_ERROR_CODES
+        if throttled:
+            record_throttled(app_id=app_id, object_id=object_id)
+        observe_graph_call(
+            method,
+            url,
+            resp.status_code,
+            time.monotonic() - started,
+            retry=retry,
+            throttled=throttled,
+            app_id=app_id,
+            app_usage=observations.get(f'app:{app_id}', {}).get('usage_pct'),
+        )
+
+        if error_message and error:
+            raise MetaGraphError(error_message % payload, status_code=resp.status_code, payload=payload)
+        return payload
+
+    @api.model
+    def _get(self, url, params=None, timeout=GRAPH_TIMEOUT, error_message=None):
+        return self._request('GET', url, params=params, timeout=timeout, error_message=error_message)
+
+    @api.model
+    def _post(self, url, data=None, timeout=GRAPH_TIMEOUT, error_message=None):
+        return self._request('POST', url, data=data, timeout=timeout, error_message=error_message)
+
+    @api.model
+    def _batch(self, graph_base, access_token, batch_requests, timeout=GRAPH_TIMEOUT, error_message=None):
+        results = []
+        for start in range(0, len(batch_requests), GRAPH_BATCH_LIMIT):
+            chunk = [
+                item if isinstance(item, dict) else {'method': 'GET', 'relative_url': item}
+                for item in batch_requests[start:start + GRAPH_BATCH_LIMIT]
+            ]
+            payload = self._post(
+                f'{graph_base}/',
+                data={
+                    'access_token': access_token,
+                    'include_headers': 'false',
+                    'batch': json.dumps(chunk),
+                },
+                timeout=timeout,
+                error_message=error_message,
+            )
+            if not isinstance(payload, list):
+                results.extend(payload for dummy in chunk)
+                continue
+            for item in payload:
+                results.append(self._parse_batch_item(item))
+        return results
+
+    @api.model
+    def _parse_batch_item(self, item):
+        if not item:
+            return {'error': {'message': 'Batch item timed out', 'type': 'BatchTimeout'}}
+        try:
+            body = json.loads(item.get('body') or '{}')
+        except ValueError:
+            body = {'error': {'message': (item.get('body') or '')[:500], 'type': 'InvalidJSON'}}
+        if not isinstance(body, dict):
+            body = {'data': body}
+        if (item.get('code') or 200) >= 400 and not body.get('error'):
+            body = {'error': {'message': f"HTTP {item.get('code')}", 'type': 'HTTPError'}, 'body': body}
+        return body
@@ -0,0 +1,48 @@
+from odoo import api, fields, models
+
+from .social_hub_metrics import pop_metric_deltas, render_prometheus
+
+
+class SocialHubMetricValue(models.Model):
+    _name = 'social.hub.metric.value'
+    _description = 'Social Hub Operational Metric'
+    _order = 'name, labels, series'
+    _log_access = False
+
+    name = fields.Char(required=True, readonly=True)
+    kind = fields.Selection(
+        [('counter', 'Counter'), ('gauge', 'Gauge'), ('histogram', 'Histogram')],
+        required=True,
+        readonly=True,
+    )
+    labels = fields.Char(required=True, readonly=True, default='[]')
+    series = fields.Char(required=True, readonly=True, default='')
+    value = fields.Float(readonly=True)
+    updated_at = fields.Datetime(readonly=True)
+
+    _series_unique = models.Constraint('UNIQUE(name, labels, series)', 'Metric series must be unique.')
+
+    @api.model
+    def _flush(self):
+        rows = pop_metric_deltas()
+        if not rows:
+            return
+        now = fields.Datetime.now()
+        for name, kind, labels, series, value in rows:
+            self.env.cr.execute("""
+                INSERT INTO social_hub_metric_value (name, kind, labels, series, value, updated_at)
+                VALUES (%(name)s, %(kind)s, %(labels)s, %(series)s, %(value)s, %(now)s)
+                ON CONFLICT (name, labels, series) DO UPDATE
+                   SET kind = EXCLUDED.kind,
+                       value = CASE WHEN EXCLUDED.kind = 'gauge' THEN EXCLUDED.value
+                                    ELSE social_hub_metric_value.value + EXCLUDED.value
+                               END,
+                       updated_at = EXCLUDED.updated_at
+            """, {'name': name, 'kind': kind, 'labels': labels, 'series': series, 'value': value, 'now': now})
+        self.invalidate_model()
+
+    @api.model
+    def _render_prometheus(self, extra_gauges=()):
+        self._flush()
+        self.env.cr.execute('SELECT name, kind, labels, series, value FROM social_hub_metric_value')
+        return render_prometheus(self.env.cr.fetchall(), extra_gauges)
@@ -0,0 +1,147 @@
+import bisect
+import json
+import re
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+GRAPH_VERSION_RE = re.compile(r'^v\d+\.\d+$')
+METRIC_HELP = {
+    'social_hub_graph_requests_total': ('counter', 'Graph API requests by endpoint, method, status, retry and throttle.'),
+    'social_hub_graph_request_seconds': ('histogram', 'Graph API request latency.'),
+    'social_hub_graph_app_usage_pct': ('gauge', 'Last X-App-Usage reading reported by Meta.'),
+    'social_hub_publish_seconds': ('histogram', 'Time spent publishing one post, Graph calls included.'),
+    'social_hub_cron_runs_total': ('counter', 'Social Hub cron runs in this process.'),
+    'social_hub_cron_items_total': ('counter', 'Items handled by Social Hub crons by outcome.'),
+    'social_hub_cron_seconds': ('histogram', 'Social Hub cron run duration.'),
+}
+
+_metrics_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+
+def inc_counter(name, labels=None, value=1):
+    key = _key(name, labels)
+    with _metrics_lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, labels=None, value=0.0):
+    with _metrics_lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe_histogram(name, labels=None, value=0.0):
+    key = _key(name, labels)
+    with _metrics_lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        if index < len(LATENCY_BUCKETS):
+            histogram['buckets'][index] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+
+def graph_endpoint_label(url):
+    parts = [part for part in urlsplit(url).path.split('/') if part]
+    if parts and GRAPH_VERSION_RE.match(parts[0]):
+        parts = parts[1:]
+    if not parts:
+        return 'batch'
+    if parts[0] in ('me', 'oauth'):
+        return '/'.join(parts[:2])
+    return parts[1] if len(parts) > 1 else 'node'
+
+
+def observe_graph_call(method, url, status, seconds, retry=False, throttled=False, app_id=None, app_usage=None):
+    labels = {
+        'endpoint': graph_endpoint_label(url),
+        'method': method,
+        'status': str(status),
+        'retry': 'true' if retry else 'false',
+        'throttled': 'true' if throttled else 'false',
+    }
+    inc_counter('social_hub_graph_requests_total', labels)
+    observe_histogram('social_hub_graph_request_seconds', {'endpoint': labels['endpoint'], 'method': method}, seconds)
+    if app_id and app_usage is not None:
+        set_gauge('social_hub_graph_app_usage_pct', {'app': app_id}, app_usage)
+
+
+def pop_metric_deltas():
+    with _metrics_lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = dict(_histograms)
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+    rows = []
+    for (name, labels), value in counters.items():
+        rows.append((name, 'counter', json.dumps(labels), '', value))
+    for (name, labels), value in gauges.items():
+        rows.append((name, 'gauge', json.dumps(labels), '', value))
+    for (name, labels), histogram in histograms.items():
+        labels_json = json.dumps(labels)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram['buckets']):
+            cumulative += count
+            rows.append((name, 'histogram', labels_json, f'bucket:{bound}', cumulative))
+        rows.append((name, 'histogram', labels_json, 'bucket:+Inf', histogram['count']))
+        rows.append((name, 'histogram', labels_json, 'sum', histogram['sum']))
+        rows.append((name, 'histogram', labels_json, 'count', histogram['count']))
+    return sorted(rows)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels) + '}'
+
+
+def _bucket_order(series):
+    bound = series.split(':', 1)[1]
+    return float('inf') if bound == '+Inf' else float(bound)
+
+
+def render_prometheus(rows=(), extra_gauges=()):
+    families = defaultdict(lambda: {'kind': None, 'series': defaultdict(dict)})
+    for name, kind, labels_json, series, value in rows:
+        family = families[name]
+        family['kind'] = kind
+        family['series'][tuple(tuple(pair) for pair in json.loads(labels_json))][series] = value
+    for name, labels, value in extra_gauges:
+        family = families[name]
+        family['kind'] = 'gauge'
+        family['series'][_key(name, labels)[1]][''] = value
+
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        metric_type, help_text = METRIC_HELP.get(name, (family['kind'], name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, values in sorted(family['series'].items()):
+            if family['kind'] != 'histogram':
+                lines.append(f'{name}{_format_labels(labels)} {values[""]}')
+                continue
+            buckets = sorted((series for series in values if series.startswith('bucket:')), key=_bucket_order)
+            for series in buckets:
+                bucket_labels = labels + (('le', series.split(':', 1)[1]),)
+                lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {values[series]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {values.get("sum", 0.0)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {values.get("count", 0)}')
+    return '\n'.join(lines) + '\n'
@@ -1,15 +1,47 @@
-from datetime import timedelta
-
-import requests
+import logging
+import math
+import os
+import secrets
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
 
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
+from .social_hub_meta_graph import GRAPH_PUBLISH_TIMEOUT, GRAPH_UPLOAD_TIMEOUT, MetaGraphError
+from .social_hub_metrics import observe_histogram
+from .social_hub_post_metric import FACEBOOK_INSIGHT_METRICS, INSTAGRAM_INSIGHT_METRICS
+from .social_hub_publish_attempt import attempt_error_payload
+from .social_hub_rate_limit import record_throttled
+from .social_hub_retry_policy import (
+    ERROR_PERMANENT,
+    ERROR_THROTTLED,
+    backoff_delay,
+    classify_publish_error,
+    is_account_error,
+)
+from .social_hub_tag import ensure_message_tsv
+
+_logger = logging.getLogger(__name__)
+
+CONTAINER_FIRST_POLL_SECONDS = 30
+MEDIA_CHECK_RETRY_SECONDS = 60
+PUBLISHABLE_PLATFORMS = ('facebook', 'instagram')
+BULK_ENQUEUE_FIELDS = (
+    'name', 'account_id', 'message', 'media_type', 'image_url', 'video_url',
+    'scheduled_at', 'max_attempts', 'retry_interval_minutes', 'campaign_id',
+)
+EPOCH = datetime(1970, 1, 1)
+CONTAINER_POLL_FIELDS = 'id,status_code,status'
+
 
 class SocialHubPost(models.Model):
     _name = 'social.hub.post'
     _description = 'Social Hub Post'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'social.hub.worker.mixin']
     _order = 'id desc'
 
     name = fields.Char(required=True, tracking=True)
@@ -19,6 +51,7 @@ class SocialHubPost(models.Model):
     platform_id = fields.Many2one(related='account_id.platform_id', store=True, readonly=True)
     platform_code = fields.Selection(related='account_id.platform_code', store=True, readonly=True)
     company_id = fields.Many2one(related='account_id.company_id', store=True, readonly=True)
+    campaign_id = fields.Many2one('social.hub.campaign', index='btree_not_null', ondelete='set null', readonly=True)
 
     media_type = fields.Selection(
         [('text', 'Text'), ('image', 'Image'), ('video', 'Video')],
@@ -26,13 +59,31 @@ class SocialHubPost(models.Model):
         required=True,
         tracking=True,
     )
-    message = fields.Text(required=True)
+    message = fields.Text(required=True, index='trigram')
+    tag_ids = fields.Many2many(
+        'social.hub.tag',
+        'social_hub_post_tag_rel',
+        'post_id',
+        'tag_id',
+        string='Tags',
+        compute='_compute_tag_ids',
+        store=True,
+        readonly=True,
+    )
     image_url = fields.Char(help='Image URL for image posts.')
     video_url = fields.Char(help='Video URL for video posts.')
 
     scheduled_at = fields.Datetime(help='If set in the future, publish job will wait until this time.')
     state = fields.Selection(
-        [('draft', 'Draft'), ('queued', 'Queued'), ('processing', 'Processing'), ('posted', 'Posted'), ('failed', 'Failed'), ('canceled', 'Canceled')],
+        [
+            ('draft', 'Draft'),
+            ('queued', 'Queued'),
+            ('processing', 'Processing'),
+            ('container_pending', 'Container Pending'),
+            ('posted', 'Posted'),
+            ('failed', 'Failed'),
+            ('canceled', 'Canceled'),
+        ],
         default='draft',
         tracking=True,
     )
@@ -41,36 +92,257 @@ class SocialHubPost(models.Model):
     max_attempts = fields.Integer(default=3)
     retry_interval_minutes = fields.Integer(default=10)
     next_retry_at = fields.Datetime(readonly=True)
+    due_at = fields.Datetime(
+        compute='_compute_due_at',
+        store=True,
+        readonly=True,
+        copy=False,
+        help='When the queue should next pick this post up; empty when it is not waiting in the queue.',
+    )
+    throttle_count = fields.Integer(default=0, readonly=True, copy=False)
+    last_error_class = fields.Selection(
+        [('permanent', 'Permanent'), ('transient', 'Transient'), ('throttled', 'Throttled')],
+        readonly=True,
+        copy=False,
+    )
+    lease_owner = fields.Char(readonly=True, copy=False, help='Queue runner currently holding this post.')
+    lease_expires_at = fields.Datetime(readonly=True, copy=False)
+    media_check_pending = fields.Boolean(
+        readonly=True,
+        copy=False,
+        help='The media URL was queued before it could be checked; the queue checks it before publishing.',
+    )
+
+    ig_creation_id = fields.Char(readonly=True, copy=False, help='Instagram media container waiting for Meta to finish processing.')
+    container_status = fields.Char(readonly=True, copy=False)
+    container_submitted_at = fields.Datetime(readonly=True, copy=False)
+    container_checked_at = fields.Datetime(readonly=True, copy=False)
 
     external_post_id = fields.Char(readonly=True)
     external_permalink = fields.Char(readonly=True)
+    permalink_pending = fields.Boolean(readonly=True, copy=False)
+    permalink_checked_at = fields.Datetime(readonly=True, copy=False)
+    permalink_tries = fields.Integer(readonly=True, copy=False)
     posted_at = fields.Datetime(readonly=True)
-    last_error = fields.Text(readonly=True)
-    provider_response = fields.Text(readonly=True)
+    insights_checked_at = fields.Datetime(readonly=True, copy=False)
+    metric_ids = fields.One2many('social.hub.post.metric', 'post_id')
+    last_attempt_id = fields.Many2one('social.hub.publish.attempt', index='btree_not_null', readonly=True, copy=False)
+    attempt_ids = fields.One2many('social.hub.publish.attempt', 'post_id')
+    last_error = fields.Char(compute='_compute_last_attempt_info')
+    provider_response = fields.Text(compute='_compute_last_attempt_info')
+
+    _due_at_pending_idx = models.Index("(due_at, id) WHERE state IN ('queued', 'failed') AND due_at IS NOT NULL")
+    _lease_expires_processing_idx = models.Index("(lease_expires_at) WHERE state = 'processing'")
+    _permalink_pending_checked_idx = models.Index('(permalink_checked_at, id) WHERE permalink_pending')
+    _container_pending_idx = models.Index("(container_checked_at, id) WHERE state = 'container_pending'")
+    _insights_posted_idx = models.Index("(insights_checked_at, id) WHERE state = 'posted' AND external_post_id IS NOT NULL")
+
+    def init(self):
+        ensure_message_tsv(self.env.cr, self._table)
+
+    @api.depends('message')
+    def _compute_tag_ids(self):
+        self.env['social.hub.tag']._assign_from_messages(self)
+
+    @api.depends('active', 'state', 'scheduled_at', 'next_retry_at', 'attempt_count', 'max_attempts', 'last_error_class')
+    def _compute_due_at(self):
+        for post in self:
+            if (
+                not post.active
+                or post.state not in ('queued', 'failed')
+                or (post.state == 'failed' and post.last_error_class == ERROR_PERMANENT)
+                or (post.attempt_count or 0) >= max(1, post.max_attempts or 1)
+            ):
+                post.due_at = False
+                continue
+            due_times = [due_time for due_time in (post.scheduled_at, post.next_retry_at) if due_time]
+            post.due_at = max(due_times) if due_times else fields.Datetime.now()
+
+    @api.depends('last_attempt_id')
+    def _compute_last_attempt_info(self):
+        for post in self:
+            attempt = post.last_attempt_id
+            post.last_error = attempt.error_message
+            post.provider_response = attempt.payload_text
 
     def action_publish_now(self):
         for post in self:
             post._attempt_publish(manual=True)
+        self.env['social.hub.rate.limit']._flush_observations()
+        self._trigger_permalink_resolution()
 
     def action_queue_publish(self):
+        media_checks = self.env['social.hub.media.check'].sudo()._get_checks(
+            self._media_url(post) for post in self
+        )
+        rejected = []
+        for post in self:
+            errors = self._media_preflight_errors(post.account_id, post, media_checks)
+            if errors:
+                rejected.append(f'{post.display_name}: {" ".join(errors)}')
+        if rejected:
+            raise UserError(_('Media preflight failed:\n%s') % '\n'.join(rejected))
+
         now = fields.Datetime.now()
         for post in self:
+            check = media_checks.get(self._media_url(post))
             post.write({
                 'state': 'queued',
                 'next_retry_at': post.scheduled_at or now,
-                'last_error': False,
+                'media_check_pending': bool(check) and check.state == 'pending',
+            })
+        self._schedule_publish_triggers(self.mapped('due_at'))
+
+    @api.model
+    def enqueue_bulk(self, rows):
+        max_rows = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.bulk_enqueue_max_rows', 5000)))
+        if len(rows) > max_rows:
+            raise UserError(_('At most %s posts can be enqueued per call.') % max_rows)
+
+        account_ids = {row.get('account_id') for row in rows if isinstance(row.get('account_id'), int)}
+        accounts = {account.id: account for account in self.env['social.hub.account'].search([('id', 'in', list(account_ids))])}
+        media_types = dict(self._fields['media_type'].selection)
+        now = fields.Datetime.now()
+
+        checked = []
+        for index, row in enumerate(rows):
+            vals = {key: row[key] for key in BULK_ENQUEUE_FIELDS if key in row}
+            vals.setdefault('media_type', 'text')
+            vals.setdefault('name', (vals.get('message') or '')[:64] or _('Post %s') % (index + 1))
+            errors = []
+            account = accounts.get(vals.get('account_id'))
+            if not account:
+                errors.append(_('Unknown account.'))
+            elif vals['media_type'] not in media_types:
+                errors.append(_('Unknown media type %s.') % vals['media_type'])
+            else:
+                errors.extend(self._check_publishable(account, vals))
+            if vals.get('scheduled_at'):
+                try:
+                    vals['scheduled_at'] = fields.Datetime.to_datetime(vals['scheduled_at'])
+                except ValueError:
+                    errors.append(_('Invalid scheduled_at.'))
+            checked.append((index, vals, account, errors))
+
+        media_checks = self.env['social.hub.media.check'].sudo()._get_checks(
+            self._media_url(vals) for index, vals, account, errors in checked if not errors
+        )
+        results = []
+        create_vals = []
+        for index, vals, account, errors in checked:
+            if not errors:
+                errors = self._media_preflight_errors(account, vals, media_checks)
+            if errors:
+                results.append({'index': index, 'id': False, 'status': 'rejected', 'errors': errors, 'media_check': False})
+                continue
+            check = media_checks.get(self._media_url(vals))
+            vals.update({
+                'state': 'queued',
+                'next_retry_at': vals.get('scheduled_at') or now,
+                'media_check_pending': bool(check) and check.state == 'pending',
+            })
+            results.append({
+                'index': index,
+                'id': False,
+                'status': 'queued',
+                'errors': [],
+                'media_check': check.state if check else False,
+            })
+            create_vals.append(vals)
+
+        posts = self.with_context(mail_create_nolog=True, mail_create_nosubscribe=True, tracking_disable=True).create(create_vals)
+        queued = iter(posts)
+        for result in results:
+            if result['status'] == 'queued':
+                result['id'] = next(queued).id
+        self._schedule_publish_triggers(posts.mapped('due_at'))
+        return results
+
+    @api.model
+    def _media_url(self, vals):
+        if vals['media_type'] == 'image':
+            return vals['image_url']
+        if vals['media_type'] == 'video':
+            return vals['video_url']
+        return False
+
+    @api.model
+    def _media_preflight_errors(self, account, vals, media_checks):
+        check = media_checks.get(self._media_url(vals))
+        if not check:
+            return []
+        return check._validation_errors(account.platform_code, vals['media_type'])
+
+    def _apply_media_preflight(self):
+        pending = self.filtered('media_check_pending')
+        if not pending:
+            return self
+        media_checks = self.env['social.hub.media.check'].sudo()._get_checks(
+            (self._media_url(post) for post in pending), probe=False,
+        )
+        deferred = self.browse()
+        rejected = self.browse()
+        for post in pending:
+            check = media_checks.get(self._media_url(post))
+            if check and check.state == 'pending':
+                deferred |= post
+                continue
+            errors = self._media_preflight_errors(post.account_id, post, media_checks)
+            post.media_check_pending = False
+            if errors:
+                post._record_publish_failure(UserError(_('Media preflight failed: %s') % ' '.join(errors)), retry=False)
+                rejected |= post
+        if deferred:
+            retry_at = fields.Datetime.now() + timedelta(seconds=MEDIA_CHECK_RETRY_SECONDS)
+            deferred.with_context(tracking_disable=True).write({
+                'state': 'queued',
+                'next_retry_at': retry_at,
+                'lease_owner': False,
+                'lease_expires_at': False,
             })
+            self._schedule_publish_triggers([retry_at])
+        return self - deferred - rejected
+
+    @api.model
+    def _check_publishable(self, account, vals):
+        errors = []
+        platform = account.platform_id
+        media_type = vals.get('media_type') or 'text'
+        message = vals.get('message') or ''
+        if account.platform_code not in PUBLISHABLE_PLATFORMS or not platform.supports_posting:
+            errors.append(_('Publishing is not supported for %s.') % platform.name)
+        if account.state != 'connected':
+            errors.append(_('Account %s is not connected.') % account.display_name)
+        if account.publish_parked:
+            errors.append(_('Publishing is parked for account %s.') % account.display_name)
+        if not message.strip():
+            errors.append(_('Message is required.'))
+        if platform.max_post_length and len(message) > platform.max_post_length:
+            errors.append(_('Message is longer than the %(limit)s characters allowed on %(platform)s.',
+                            limit=platform.max_post_length, platform=platform.name))
+        if account.platform_code == 'instagram' and media_type == 'text':
+            errors.append(_('Instagram does not support text-only publishing in this flow. Use image or video.'))
+        if media_type == 'image' and not vals.get('image_url'):
+            errors.append(_('Image posts require image_url.'))
+        if media_type == 'video' and not vals.get('video_url'):
+            errors.append(_('Video posts require video_url.'))
+        return errors
 
     def action_cancel(self):
-        self.write({'state': 'canceled'})
+        self.write({'state': 'canceled', 'lease_owner': False, 'lease_expires_at': False})
 
     def action_reset_draft(self):
         self.write({
             'state': 'draft',
             'attempt_count': 0,
             'next_retry_at': False,
-            'last_error': False,
-            'provider_response': False,
+            'last_attempt_id': False,
+            'lease_owner': False,
+            'lease_expires_at': False,
+            'ig_creation_id': False,
+            'container_status': False,
+            'container_submitted_at': False,
+            'container_checked_at': False,
         })
 
     def _attempt_publish(self, manual=False):
@@ -82,32 +354,195 @@ class SocialHubPost(models.Model):
         if self.scheduled_at and self.scheduled_at > fields.Datetime.now() and not manual:
             return
 
-        self.write({'state': 'processing'})
+        if manual:
+            if self.state == 'processing' and self.lease_expires_at and self.lease_expires_at > fields.Datetime.now():
+                raise UserError(_('This post is already being published by %s.') % self.lease_owner)
+            self.write(dict(self._get_lease_vals(self._new_lease_owner()), state='processing'))
+        started = time.monotonic()
+        outcome = 'posted'
         try:
-            result = self._publish_to_provider()
-            self.write({
-                'state': 'posted',
-                'external_post_id': result.get('id') or result.get('post_id') or result.get('creation_id'),
-                'external_permalink': result.get('permalink_url') or False,
-                'posted_at': fields.Datetime.now(),
-                'last_error': False,
-                'provider_response': str(result),
-            })
-            self.message_post(body=_('Post published successfully: %s') % (self.external_post_id or 'ok'))
+            result = self.with_context(social_hub_retry=bool(self.attempt_count))._publish_to_provider()
+            duration_ms = int((time.monotonic() - started) * 1000)
+            if result.get('container_pending'):
+                outcome = 'container_pending'
+                self._record_container_pending(result, duration_ms=duration_ms)
+            else:
+                self._record_publish_success(result, duration_ms=duration_ms)
         except Exception as exc:
-            attempts = (self.attempt_count or 0) + 1
-            will_retry = attempts < (self.max_attempts or 1)
-            vals = {
-                'attempt_count': attempts,
-                'last_error': str(exc),
-                'provider_response': str(exc),
-                'state': 'queued' if will_retry and not manual else 'failed',
-                'next_retry_at': fields.Datetime.now() + timedelta(minutes=max(1, self.retry_interval_minutes or 10)) if will_retry and not manual else False,
-            }
-            self.write(vals)
-            self.message_post(body=_('Publish failed (attempt %s/%s): %s') % (attempts, self.max_attempts, str(exc)))
+            duration_ms = int((time.monotonic() - started) * 1000)
+            outcome = classify_publish_error(exc)
+            if not manual and outcome == ERROR_THROTTLED:
+                self._defer_throttled(exc, duration_ms=duration_ms)
+                return
+            self._record_publish_failure(exc, retry=not manual, duration_ms=duration_ms)
             if manual:
                 raise
+        finally:
+            observe_histogram(
+                'social_hub_publish_seconds',
+                {'platform': self.platform_code or 'unknown', 'outcome': outcome},
+                time.monotonic() - started,
+            )
+
+    def _log_attempt(self, outcome, payload, attempt_no=None, duration_ms=0, error=False):
+        if attempt_no is None:
+            attempt_no = (self.attempt_count or 0) + 1
+        return self.env['social.hub.publish.attempt']._log(
+            self, outcome, payload, attempt_no, duration_ms=duration_ms, error=error,
+        )
+
+    def _record_publish_success(self, result, duration_ms=0):
+        external_post_id = result.get('id') or result.get('post_id') or result.get('creation_id')
+        attempt = self._log_attempt('posted', result, duration_ms=duration_ms)
+        self._queue_write({
+            'state': 'posted',
+            'external_post_id': external_post_id,
+            'external_permalink': result.get('permalink_url') or False,
+            'permalink_pending': bool(external_post_id and not result.get('permalink_url')),
+            'posted_at': fields.Datetime.now(),
+            'last_attempt_id': attempt.id,
+            'last_error_class': False,
+            'throttle_count': 0,
+            'lease_owner': False,
+            'lease_expires_at': False,
+        })
+        self._log_note(_('Post published successfully: %s') % (self.external_post_id or 'ok'))
+
+    def _record_publish_failure(self, exc, retry=True, duration_ms=0):
+        error_class = classify_publish_error(exc)
+        attempts = (self.attempt_count or 0) + 1
+        retryable = error_class != ERROR_PERMANENT and attempts < (self.max_attempts or 1)
+        will_retry = retry and retryable
+        next_retry_at = False
+        if retryable:
+            max_delay = self._get_publish_queue_settings()['retry_max_delay_minutes']
+            next_retry_at = fields.Datetime.now() + backoff_delay(self.retry_interval_minutes or 10, attempts, max_delay)
+        attempt = self._log_attempt(
+            error_class, attempt_error_payload(exc), attempt_no=attempts, duration_ms=duration_ms, error=str(exc),
+        )
+        vals = {
+            'attempt_count': attempts,
+            'last_attempt_id': attempt.id,
+            'last_error_class': error_class,
+            'state': 'queued' if will_retry else 'failed',
+            'next_retry_at': next_retry_at,
+            'lease_owner': False,
+            'lease_expires_at': False,
+        }
+        self._queue_write(vals)
+        if next_retry_at:
+            self._schedule_publish_triggers([next_retry_at])
+        if is_account_error(exc):
+            self.account_id._park_publishing(str(exc))
+        self._log_note(_(
+            'Publish failed (attempt %(attempt)s/%(max)s, %(error_class)s): %(error)s',
+            attempt=attempts,
+            max=self.max_attempts,
+            error_class=error_class,
+            error=str(exc),
+        ))
+
+    def _record_container_pending(self, result, duration_ms=0):
+        now = fields.Datetime.now()
+        attempt = self._log_attempt('container_pending', result, duration_ms=duration_ms)
+        self._queue_write({
+            'state': 'container_pending',
+            'ig_creation_id': result['creation_id'],
+            'container_status': 'IN_PROGRESS',
+            'container_submitted_at': now,
+            'container_checked_at': False,
+            'last_attempt_id': attempt.id,
+            'lease_owner': False,
+            'lease_expires_at': False,
+        })
+        cron = self.env.ref('social_hub.ir_cron_social_hub_poll_ig_containers', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger(at=now + timedelta(seconds=CONTAINER_FIRST_POLL_SECONDS))
+
+    def _defer_throttled(self, exc, duration_ms=0):
+        backoff_minutes = self.env['social.hub.rate.limit']._get_budget_settings()['throttle_backoff_minutes']
+        max_delay = self._get_publish_queue_settings()['retry_max_delay_minutes']
+        throttle_count = (self.throttle_count or 0) + 1
+        delay = backoff_delay(backoff_minutes, throttle_count, max_delay)
+        app_id, object_id = self._rate_limit_ids()
+        record_throttled(app_id=app_id, object_id=object_id, regain_minutes=int(delay.total_seconds() // 60))
+        attempt = self._log_attempt(ERROR_THROTTLED, attempt_error_payload(exc), duration_ms=duration_ms, error=str(exc))
+        self.with_context(tracking_disable=True).write({
+            'state': 'queued',
+            'next_retry_at': fields.Datetime.now() + delay,
+            'throttle_count': throttle_count,
+            'last_error_class': ERROR_THROTTLED,
+            'last_attempt_id': attempt.id,
+            'lease_owner': False,
+            'lease_expires_at': False,
+        })
+        self._schedule_publish_triggers([self.next_retry_at])
+
+    def _rate_limit_ids(self):
+        self.ensure_one()
+        if self.platform_code not in ('facebook', 'instagram'):
+            return False, False
+        return self.account_id._get_meta_conf()['app_id'] or False, self.account_id.external_uid or False
+
+    def _rate_limit_keys(self):
+        app_id, object_id = self._rate_limit_ids()
+        keys = []
+        if app_id:
+            keys.append(f'app:{app_id}')
+        if object_id:
+            keys.append(f'object:{object_id}')
+        return keys
+
+    def _apply_rate_limit_budget(self):
+        rate_limits = self.env['social.hub.rate.limit']
+        rate_limits._flush_observations()
+        keys_by_post = {post.id: post._rate_limit_keys() for post in self}
+        budget = rate_limits._get_dispatch_budget({key for keys in keys_by_post.values() for key in keys})
+
+        now = fields.Datetime.now()
+        dispatch = self.browse()
+        deferred = defaultdict(lambda: self.browse())
+        for post in self:
+            keys = keys_by_post[post.id]
+            blocked = [key for key in keys if budget[key]['tokens'] < 1]
+            if blocked:
+                resume_at = max(budget[key]['resume_at'] or now + timedelta(minutes=1) for key in blocked)
+                deferred[resume_at] |= post
+                continue
+            for key in keys:
+                budget[key]['tokens'] -= 1
+            dispatch |= post
+        rate_limits._store_dispatch_budget(budget)
+
+        for resume_at, posts in deferred.items():
+            posts.with_context(tracking_disable=True).write({
+                'state': 'queued',
+                'next_retry_at': resume_at,
+                'lease_owner': False,
+                'lease_expires_at': False,
+            })
+        self._schedule_publish_triggers(list(deferred))
+        return dispatch
+
+    @api.model
+    def _schedule_publish_triggers(self, due_times):
+        cron = self.env.ref('social_hub.ir_cron_social_hub_publish_queue', raise_if_not_found=False)
+        due_times = [due_time for due_time in due_times if due_time]
+        if not cron or not due_times:
+            return
+        granularity = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.trigger_coalesce_seconds', 15)))
+        now = fields.Datetime.now()
+        wakeups = set()
+        for due_time in due_times:
+            seconds = (max(due_time, now) - EPOCH).total_seconds()
+            wakeups.add(EPOCH + timedelta(seconds=math.ceil(seconds / granularity) * granularity))
+        existing = set(self.env['ir.cron.trigger'].sudo().search([
+            ('cron_id', '=', cron.id),
+            ('call_at', 'in', list(wakeups)),
+        ]).mapped('call_at'))
+        wakeups = sorted(wakeups - existing)
+        if wakeups:
+            cron.sudo()._trigger(at=wakeups)
 
     def _publish_to_provider(self):
         self.ensure_one()
@@ -117,6 +552,8 @@ class SocialHubPost(models.Model):
             raise UserError(_('Account has no access token. Connect OAuth first.'))
         if self.account_id.state != 'connected':
             raise UserError(_('Account is not connected.'))
+        if self.account_id.publish_parked:
+            raise UserError(_('Publishing is parked for this account: %s') % (self.account_id.publish_parked_reason or ''))
 
         if self.platform_code == 'facebook':
             return self._publish_facebook_page_post()
@@ -129,6 +566,7 @@ class SocialHubPost(models.Model):
         if not self.account_id.external_uid:
             raise UserError(_('Facebook account has no external page id.'))
 
+        graph = self.account_id._meta_graph()
         graph_base = self._meta_graph_base()
         page_id = self.account_id.external_uid
         token = self.account_id.access_token
@@ -136,18 +574,16 @@ class SocialHubPost(models.Model):
         if self.media_type == 'video':
             if not self.video_url:
                 raise UserError(_('Facebook video post requires video_url.'))
-            resp = requests.post(
+            data = graph._post(
                 f"{graph_base}/{page_id}/videos",
                 data={
                     'file_url': self.video_url,
                     'description': self.message,
                     'access_token': token,
                 },
-                timeout=60,
+                timeout=GRAPH_UPLOAD_TIMEOUT,
+                error_message=_('Facebook video publish failed: %s'),
             )
-            data = resp.json()
-            if resp.status_code >= 400 or data.get('error'):
-                raise UserError(_('Facebook video publish failed: %s') % data)
             return {'id': data.get('id')}
 
         payload = {
@@ -159,29 +595,20 @@ class SocialHubPost(models.Model):
                 raise UserError(_('Facebook image post requires image_url.'))
             payload['link'] = self.image_url
 
-        resp = requests.post(f"{graph_base}/{page_id}/feed", data=payload, timeout=45)
-        data = resp.json()
-        if resp.status_code >= 400 or data.get('error'):
-            raise UserError(_('Facebook publish failed: %s') % data)
-
-        post_id = data.get('id')
-        permalink = False
-        if post_id:
-            p_resp = requests.get(
-                f"{graph_base}/{post_id}",
-                params={'fields': 'id,permalink_url', 'access_token': token},
-                timeout=30,
-            )
-            p_data = p_resp.json()
-            if p_resp.status_code < 400 and not p_data.get('error'):
-                permalink = p_data.get('permalink_url')
+        data = graph._post(
+            f"{graph_base}/{page_id}/feed",
+            data=payload,
+            timeout=GRAPH_PUBLISH_TIMEOUT,
+            error_message=_('Facebook publish failed: %s'),
+        )
 
-        return {'id': post_id, 'permalink_url': permalink}
+        return {'id': data.get('id')}
 
     def _publish_instagram_post(self):
         if not self.account_id.external_uid:
             raise UserError(_('Instagram account has no external IG user id.'))
 
+        graph = self.account_id._meta_graph()
         graph_base = self._meta_graph_base()
         ig_user_id = self.account_id.external_uid
         token = self.account_id.access_token
@@ -203,48 +630,440 @@ class SocialHubPost(models.Model):
             create_payload['video_url'] = self.video_url
             create_payload['media_type'] = 'REELS'
 
-        create_resp = requests.post(f"{graph_base}/{ig_user_id}/media", data=create_payload, timeout=60)
-        create_data = create_resp.json()
-        if create_resp.status_code >= 400 or create_data.get('error'):
-            raise UserError(_('Instagram media container creation failed: %s') % create_data)
+        create_data = graph._post(
+            f"{graph_base}/{ig_user_id}/media",
+            data=create_payload,
+            timeout=GRAPH_UPLOAD_TIMEOUT,
+            error_message=_('Instagram media container creation failed: %s'),
+        )
 
         creation_id = create_data.get('id')
         if not creation_id:
             raise UserError(_('Instagram media container id missing.'))
 
-        publish_resp = requests.post(
+        if self.media_type == 'video':
+            return {'creation_id': creation_id, 'container_pending': True}
+
+        publish_data = graph._post(
             f"{graph_base}/{ig_user_id}/media_publish",
             data={'creation_id': creation_id, 'access_token': token},
-            timeout=45,
+            timeout=GRAPH_PUBLISH_TIMEOUT,
+            error_message=_('Instagram media publish failed: %s'),
         )
-        publish_data = publish_resp.json()
-        if publish_resp.status_code >= 400 or publish_data.get('error'):
-            raise UserError(_('Instagram media publish failed: %s') % publish_data)
-
-        ig_media_id = publish_data.get('id')
-        permalink = False
-        if ig_media_id:
-            detail_resp = requests.get(
-                f"{graph_base}/{ig_media_id}",
-                params={'fields': 'id,permalink', 'access_token': token},
-                timeout=30,
+
+        return {'id': publish_data.get('id'), 'creation_id': creation_id}
+
+    def _poll_instagram_containers(self):
+        timeout_minutes = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.ig_container_timeout_minutes', 60)))
+        now = fields.Datetime.now()
+        posts_by_token = defaultdict(lambda: self.browse())
+        for post in self:
+            if post.account_id.access_token and post.ig_creation_id:
+                posts_by_token[(post.account_id._meta_graph_base(), post.account_id.access_token)] |= post
+
+        for (graph_base, token), posts in posts_by_token.items():
+            graph = posts[0].account_id._meta_graph()
+            try:
+                statuses = graph._batch(
+                    graph_base,
+                    token,
+                    [f'{post.ig_creation_id}?fields={CONTAINER_POLL_FIELDS}' for post in posts],
+                    error_message=_('Instagram container status batch failed: %s'),
+                )
+            except UserError as exc:
+                _logger.warning('Social Hub container poll for %s posts failed: %s', len(posts), exc)
+                continue
+
+            finished = self.browse()
+            for post, status in zip(posts, statuses):
+                status_code = status.get('status_code') or ('ERROR' if status.get('error') else 'IN_PROGRESS')
+                if status_code == 'FINISHED':
+                    finished |= post
+                elif status_code == 'ERROR':
+                    post._record_publish_failure(UserError(
+                        _('Instagram container %(id)s ended in %(status)s: %(detail)s',
+                          id=post.ig_creation_id, status=status_code, detail=status.get('status') or status.get('error') or '')
+                    ), retry=True)
+                elif status_code == 'EXPIRED' or (
+                    post.container_submitted_at and post.container_submitted_at < now - timedelta(minutes=timeout_minutes)
+                ):
+                    post._record_publish_failure(MetaGraphError(
+                        _('Instagram container %(id)s was not published in time (%(status)s).', id=post.ig_creation_id, status=status_code),
+                        payload={'error': {'type': 'ContainerExpired', 'is_transient': True}},
+                    ), retry=True)
+                else:
+                    post._queue_write({'container_status': status_code, 'container_checked_at': now})
+
+            if not finished:
+                continue
+            results = graph._batch(
+                graph_base,
+                token,
+                [{
+                    'method': 'POST',
+                    'relative_url': f'{post.account_id.external_uid}/media_publish',
+                    'body': urlencode({'creation_id': post.ig_creation_id}),
+                } for post in finished],
+                timeout=GRAPH_PUBLISH_TIMEOUT,
             )
-            detail_data = detail_resp.json()
-            if detail_resp.status_code < 400 and not detail_data.get('error'):
-                permalink = detail_data.get('permalink')
+            for post, result in zip(finished, results):
+                if result.get('error'):
+                    post._record_publish_failure(
+                        MetaGraphError(_('Instagram media publish failed: %s') % result, payload=result),
+                        retry=True,
+                    )
+                else:
+                    post._record_publish_success({'id': result.get('id'), 'creation_id': post.ig_creation_id})
+        self._trigger_permalink_resolution()
+
+    def _permalink_field(self):
+        return 'permalink_url' if self.platform_code == 'facebook' else 'permalink'
+
+    def _trigger_permalink_resolution(self):
+        if not self.filtered('permalink_pending'):
+            return
+        cron = self.env.ref('social_hub.ir_cron_social_hub_resolve_permalinks', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
 
-        return {'id': ig_media_id, 'creation_id': creation_id, 'permalink_url': permalink}
+    def _resolve_permalinks(self, max_tries=5):
+        graph = self.env['social.hub.meta.graph']
+        resolved = 0
+        posts_by_token = defaultdict(lambda: self.browse())
+        for post in self:
+            if not post.external_post_id:
+                post._queue_write({'permalink_pending': False})
+            elif not post.account_id.access_token:
+                post._record_permalink_failure(max_tries)
+            else:
+                posts_by_token[(post.account_id._meta_graph_base(), post.account_id.access_token)] |= post
+
+        for (graph_base, token), posts in posts_by_token.items():
+            try:
+                results = graph._batch(
+                    graph_base,
+                    token,
+                    [f'{post.external_post_id}?fields=id,{post._permalink_field()}' for post in posts],
+                    error_message=_('Meta permalink batch failed: %s'),
+                )
+            except UserError as exc:
+                _logger.warning('Social Hub permalink lookup for %s posts failed: %s', len(posts), exc)
+                for post in posts:
+                    post._record_permalink_failure(max_tries)
+                continue
+            for post, data in zip(posts, results):
+                permalink = not data.get('error') and data.get(post._permalink_field())
+                if not permalink:
+                    post._record_permalink_failure(max_tries)
+                    continue
+                post._queue_write({
+                    'external_permalink': permalink,
+                    'permalink_pending': False,
+                    'permalink_checked_at': fields.Datetime.now(),
+                })
+                resolved += 1
+        return resolved
+
+    def _record_permalink_failure(self, max_tries):
+        tries = (self.permalink_tries or 0) + 1
+        self._queue_write({
+            'permalink_tries': tries,
+            'permalink_checked_at': fields.Datetime.now(),
+            'permalink_pending': tries < max_tries,
+        })
+
+    def _insights_request(self):
+        if self.platform_code == 'facebook':
+            return f"{self.external_post_id}/insights?metric={','.join(FACEBOOK_INSIGHT_METRICS)}"
+        return f"{self.external_post_id}/insights?metric={','.join(INSTAGRAM_INSIGHT_METRICS)}"
+
+    def _collect_insights(self):
+        metrics = self.env['social.hub.post.metric']
+        now = fields.Datetime.now()
+        collected = 0
+        posts_by_token = defaultdict(lambda: self.browse())
+        for post in self:
+            if post.account_id.access_token and post.external_post_id:
+                posts_by_token[(post.account_id._meta_graph_base(), post.account_id.access_token)] |= post
+        skipped = self - self.browse().union(*posts_by_token.values())
+        if skipped:
+            skipped._queue_write({'insights_checked_at': now})
+
+        for (graph_base, token), posts in posts_by_token.items():
+            try:
+                results = posts[0].account_id._meta_graph()._batch(
+                    graph_base,
+                    token,
+                    [post._insights_request() for post in posts],
+                    error_message=_('Meta insights batch failed: %s'),
+                )
+            except UserError as exc:
+                _logger.warning('Social Hub insights fetch for %s posts failed: %s', len(posts), exc)
+                posts._queue_write({'insights_checked_at': now})
+                continue
+            samples = []
+            for post, data in zip(posts, results):
+                if data.get('error'):
+                    _logger.info('Social Hub insights for post %s unavailable: %s', post.id, data['error'].get('message'))
+                    continue
+                samples.append((post, metrics._parse_insights(post.platform_code, data)))
+            metrics._record_samples(samples, now)
+            posts._queue_write({'insights_checked_at': now})
+            collected += len(samples)
+        return collected
+
+    def action_view_metrics(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Post Insights'),
+            'res_model': 'social.hub.post.metric',
+            'view_mode': 'graph,pivot,list',
+            'domain': [('post_id', '=', self.id)],
+        }
+
+    def _get_publish_queue_settings(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return {
+            'batch_size': max(1, int(get_param('social_hub.publish_batch_size', 50))),
+            'workers': max(1, int(get_param('social_hub.publish_workers', 1))),
+            'account_concurrency': max(1, int(get_param('social_hub.publish_account_concurrency', 1))),
+            'lease_minutes': max(1, int(get_param('social_hub.publish_lease_minutes', 15))),
+            'retry_max_delay_minutes': max(1, int(get_param('social_hub.retry_max_delay_minutes', 360))),
+        }
 
     @api.model
-    def cron_process_publish_queue(self):
+    def _new_lease_owner(self):
+        return f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+
+    @api.model
+    def _get_lease_vals(self, owner):
+        lease_minutes = self._get_publish_queue_settings()['lease_minutes']
+        return {
+            'lease_owner': owner,
+            'lease_expires_at': fields.Datetime.now() + timedelta(minutes=lease_minutes),
+        }
+
+    @api.model
+    def _claim_publish_batch(self, owner, limit):
+        self.env['social.hub.post'].flush_model()
+        params = {
+            'owner': owner,
+            'expires_at': self._get_lease_vals(owner)['lease_expires_at'],
+            'now': fields.Datetime.now(),
+            'limit': limit,
+        }
+        self.env.cr.execute("""
+            UPDATE social_hub_post
+               SET lease_owner = %(owner)s,
+                   lease_expires_at = %(expires_at)s
+             WHERE id IN (
+                    SELECT post.id
+                      FROM social_hub_post post
+                     WHERE post.state = 'processing'
+                       AND (post.lease_expires_at < %(now)s OR post.lease_expires_at IS NULL)
+                       AND NOT EXISTS (
+                            SELECT 1
+                              FROM social_hub_account account
+                             WHERE account.id = post.account_id
+                               AND account.publish_parked
+                       )
+                  ORDER BY post.lease_expires_at NULLS FIRST, post.id
+                     LIMIT %(limit)s
+                       FOR UPDATE OF post SKIP LOCKED
+             )
+         RETURNING id
+        """, params)
+        post_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        params['limit'] = limit - len(post_ids)
+        if params['limit'] > 0:
+            self.env.cr.execute("""
+                UPDATE social_hub_post
+                   SET state = 'processing',
+                       due_at = NULL,
+                       lease_owner = %(owner)s,
+                       lease_expires_at = %(expires_at)s
+                 WHERE id IN (
+                        SELECT post.id
+                          FROM social_hub_post post
+                         WHERE post.state IN ('queued', 'failed')
+                           AND post.due_at <= %(now)s
+                           AND NOT EXISTS (
+                                SELECT 1
+                                  FROM social_hub_account account
+                                 WHERE account.id = post.account_id
+                                   AND account.publish_parked
+                           )
+                      ORDER BY post.due_at, post.id
+                         LIMIT %(limit)s
+                           FOR UPDATE OF post SKIP LOCKED
+                 )
+             RETURNING id
+            """, params)
+            post_ids += [row[0] for row in self.env.cr.fetchall()]
+
+        self.env['social.hub.post'].invalidate_model(['state', 'due_at', 'lease_owner', 'lease_expires_at'])
+        return self.browse(sorted(post_ids))
+
+    @api.model
+    def get_queue_stats(self):
+        self.check_access('read')
         now = fields.Datetime.now()
-        domain = [
-            ('state', 'in', ['queued', 'failed']),
-            '|', ('next_retry_at', '=', False), ('next_retry_at', '<=', now),
-            '|', ('scheduled_at', '=', False), ('scheduled_at', '<=', now),
-        ]
-        posts = self.sudo().search(domain, limit=50)
-        for post in posts:
-            if post.attempt_count >= max(1, post.max_attempts or 1):
+        self.env['social.hub.post'].flush_model(['state', 'due_at', 'lease_expires_at'])
+        self.env.cr.execute("""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE due_at <= %(now)s),
+                   MIN(due_at)
+              FROM social_hub_post
+             WHERE state IN ('queued', 'failed')
+               AND due_at IS NOT NULL
+        """, {'now': now})
+        pending, due, oldest_due_at = self.env.cr.fetchone()
+        self.env.cr.execute("""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE lease_expires_at < %(now)s OR lease_expires_at IS NULL)
+              FROM social_hub_post
+             WHERE state = 'processing'
+        """, {'now': now})
+        processing, expired_leases = self.env.cr.fetchone()
+        self.env.cr.execute("SELECT COUNT(*) FROM social_hub_post WHERE state = 'container_pending'")
+        container_pending = self.env.cr.fetchone()[0]
+        return {
+            'pending': pending,
+            'due': due,
+            'oldest_due_at': oldest_due_at,
+            'lag_seconds': max(0.0, (now - oldest_due_at).total_seconds()) if oldest_due_at and oldest_due_at <= now else 0.0,
+            'processing': processing,
+            'expired_leases': expired_leases,
+            'container_pending': container_pending,
+        }
+
+    def _split_publish_lanes(self, account_concurrency):
+        posts_by_account = defaultdict(list)
+        for post in self:
+            posts_by_account[post.account_id.id].append(post.id)
+
+        lanes = []
+        for post_ids in posts_by_account.values():
+            lane_count = min(account_concurrency, len(post_ids))
+            lanes.extend(post_ids[index::lane_count] for index in range(lane_count))
+        return lanes
+
+    def _publish_lane(self, owner):
+        for post in self:
+            if post.state != 'processing' or post.lease_owner != owner:
                 continue
             post._attempt_publish(manual=False)
+            post._worker_commit()
+
+    @api.model
+    def _oldest_due_at(self):
+        self.env['social.hub.post'].flush_model(['state', 'due_at'])
+        self.env.cr.execute("""
+            SELECT MIN(due_at)
+              FROM social_hub_post
+             WHERE state IN ('queued', 'failed')
+               AND due_at IS NOT NULL
+        """)
+        return self.env.cr.fetchone()[0]
+
+    def _count_states(self):
+        return dict(self.env['social.hub.post'].sudo()._read_group([('id', 'in', self.ids)], ['state'], ['__count']))
+
+    @api.model
+    def cron_process_publish_queue(self):
+        run_start = self.env['social.hub.cron.run']._start()
+        oldest_due_at = self._oldest_due_at()
+        settings = self._get_publish_queue_settings()
+        owner = self._new_lease_owner()
+        posts = self.sudo()._claim_publish_batch(owner, settings['batch_size'])
+        if not posts:
+            return
+        posts = posts._apply_media_preflight()._apply_rate_limit_budget()
+        self.env.cr.commit()
+        lanes = posts._split_publish_lanes(settings['account_concurrency'])
+        posts._run_in_worker_pool(lanes, '_publish_lane', max_workers=settings['workers'], args=(owner,))
+        self.env['social.hub.rate.limit']._flush_observations()
+        posts.invalidate_recordset(['state', 'permalink_pending'])
+        posts._trigger_permalink_resolution()
+        states = posts._count_states()
+        self.env['social.hub.cron.run']._record(
+            'publish_queue',
+            run_start,
+            batch_size=len(posts),
+            success_count=states.get('posted', 0) + states.get('container_pending', 0),
+            failure_count=states.get('failed', 0),
+            lag_seconds=max(0.0, (run_start[0] - oldest_due_at).total_seconds()) if oldest_due_at else 0.0,
+        )
+
+    @api.model
+    def cron_poll_instagram_containers(self, limit=500):
+        run_start = self.env['social.hub.cron.run']._start()
+        posts = self.sudo().search(
+            [('state', '=', 'container_pending')],
+            order='container_checked_at asc nulls first, id',
+            limit=limit,
+        )
+        posts._poll_instagram_containers()
+        self.env['social.hub.rate.limit']._flush_observations()
+        if posts:
+            states = posts._count_states()
+            self.env['social.hub.cron.run']._record(
+                'poll_ig_containers',
+                run_start,
+                batch_size=len(posts),
+                success_count=states.get('posted', 0),
+                failure_count=states.get('failed', 0),
+            )
+        if self.sudo().search_count([('state', '=', 'container_pending')], limit=1):
+            self.env.ref('social_hub.ir_cron_social_hub_poll_ig_containers').sudo()._trigger(
+                at=fields.Datetime.now() + timedelta(seconds=CONTAINER_FIRST_POLL_SECONDS),
+            )
+
+    @api.model
+    def cron_collect_insights(self):
+        run_start = self.env['social.hub.cron.run']._start()
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        limit = max(1, int(get_param('social_hub.insights_batch_size', 500)))
+        lookback_days = max(1, int(get_param('social_hub.insights_lookback_days', 30)))
+        interval_minutes = max(1, int(get_param('social_hub.insights_interval_minutes', 360)))
+        now = fields.Datetime.now()
+        posts = self.sudo().search([
+            ('state', '=', 'posted'),
+            ('external_post_id', '!=', False),
+            ('posted_at', '>=', now - timedelta(days=lookback_days)),
+            '|', ('insights_checked_at', '=', False),
+            ('insights_checked_at', '<=', now - timedelta(minutes=interval_minutes)),
+        ], order='insights_checked_at asc nulls first, id', limit=limit)
+        collected = posts._collect_insights()
+        self.env['social.hub.rate.limit']._flush_observations()
+        if posts:
+            self.env['social.hub.cron.run']._record(
+                'collect_insights',
+                run_start,
+                batch_size=len(posts),
+                success_count=collected,
+                failure_count=len(posts) - collected,
+            )
+
+    @api.model
+    def cron_resolve_permalinks(self, limit=500):
+        run_start = self.env['social.hub.cron.run']._start()
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        max_tries = max(1, int(get_param('social_hub.permalink_max_tries', 5)))
+        retry_minutes = max(1, int(get_param('social_hub.permalink_retry_minutes', 30)))
+        posts = self.sudo().search([
+            ('permalink_pending', '=', True),
+            '|', ('permalink_checked_at', '=', False),
+            ('permalink_checked_at', '<=', fields.Datetime.now() - timedelta(minutes=retry_minutes)),
+        ], order='permalink_checked_at asc nulls first, id', limit=limit)
+        resolved = posts._resolve_permalinks(max_tries=max_tries)
+        if posts:
+            self.env['social.hub.cron.run']._record(
+                'resolve_permalinks',
+                run_start,
+                batch_size=len(posts),
+                success_count=resolved,
+                failure_count=len(posts) - resolved,
+            )
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+INSIGHT_METRICS = [('impressions', 'Impressions'), ('reach', 'Reach'), ('engagement', 'Engagement')]
+FACEBOOK_INSIGHT_METRICS = {
+    'post_impressions': 'impressions',
+    'post_impressions_unique': 'reach',
+    'post_engaged_users': 'engagement',
+}
+INSTAGRAM_INSIGHT_METRICS = {
+    'views': 'impressions',
+    'reach': 'reach',
+    'total_interactions': 'engagement',
+}
+
+
+class SocialHubPostMetric(models.Model):
+    _name = 'social.hub.post.metric'
+    _description = 'Social Hub Post Metric'
+    _order = 'captured_at desc, id desc'
+    _log_access = False
+
+    post_id = fields.Many2one('social.hub.post', required=True, ondelete='cascade', index=True, readonly=True)
+    account_id = fields.Many2one('social.hub.account', readonly=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    metric = fields.Selection(INSIGHT_METRICS, required=True, readonly=True)
+    value = fields.Integer(readonly=True, aggregator='max')
+    captured_at = fields.Datetime(required=True, readonly=True)
+    resolution = fields.Selection(
+        [('raw', 'Raw'), ('day', 'Daily')],
+        default='raw',
+        required=True,
+        readonly=True,
+    )
+
+    _sample_unique = models.Constraint(
+        'UNIQUE(post_id, metric, resolution, captured_at)',
+        'This metric sample was already recorded.',
+    )
+    _metric_captured_idx = models.Index('(metric, captured_at)')
+    _raw_captured_idx = models.Index("(captured_at) WHERE resolution = 'raw'")
+
+    @api.model
+    def _parse_insights(self, platform_code, payload):
+        names = FACEBOOK_INSIGHT_METRICS if platform_code == 'facebook' else INSTAGRAM_INSIGHT_METRICS
+        values = {}
+        for row in payload.get('data') or []:
+            metric = names.get(row.get('name'))
+            samples = row.get('values') or []
+            value = samples[-1].get('value') if samples else (row.get('total_value') or {}).get('value')
+            if metric and isinstance(value, (int, float)):
+                values[metric] = int(value)
+        return values
+
+    @api.model
+    def _record_samples(self, samples, captured_at):
+        vals_list = [
+            {
+                'post_id': post.id,
+                'account_id': post.account_id.id,
+                'company_id': post.company_id.id,
+                'metric': metric,
+                'value': value,
+                'captured_at': captured_at,
+            }
+            for post, values in samples
+            for metric, value in values.items()
+        ]
+        return self.sudo().create(vals_list) if vals_list else self.browse()
+
+    @api.model
+    def cron_downsample(self):
+        raw_days = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.insights_raw_retention_days', 14)))
+        cutoff = fields.Date.today() - timedelta(days=raw_days)
+        self.flush_model()
+        self.env.cr.execute("""
+            INSERT INTO social_hub_post_metric (post_id, account_id, company_id, metric, value, captured_at, resolution)
+                 SELECT post_id, account_id, company_id, metric, MAX(value), date_trunc('day', captured_at), 'day'
+                   FROM social_hub_post_metric
+                  WHERE resolution = 'raw'
+                    AND captured_at < %(cutoff)s
+               GROUP BY post_id, account_id, company_id, metric, date_trunc('day', captured_at)
+            ON CONFLICT (post_id, metric, resolution, captured_at)
+              DO UPDATE SET value = GREATEST(social_hub_post_metric.value, EXCLUDED.value)
+        """, {'cutoff': cutoff})
+        self.env.cr.execute(
+            "DELETE FROM social_hub_post_metric WHERE resolution = 'raw' AND captured_at < %s",
+            (cutoff,),
+        )
+        self.invalidate_model()
@@ -0,0 +1,87 @@
+import json
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from .social_hub_meta_graph import MetaGraphError
+
+_logger = logging.getLogger(__name__)
+
+ATTEMPT_ERROR_MAX_LENGTH = 500
+
+
+def attempt_error_payload(exc):
+    if isinstance(exc, MetaGraphError):
+        return {'status_code': exc.status_code, 'error': exc.error, 'response': exc.payload}
+    return {'error': {'message': str(exc), 'type': type(exc).__name__}}
+
+
+class SocialHubPublishAttempt(models.Model):
+    _name = 'social.hub.publish.attempt'
+    _description = 'Social Hub Publish Attempt'
+    _order = 'started_at desc, id desc'
+    _log_access = False
+
+    post_id = fields.Many2one('social.hub.post', required=True, ondelete='cascade', index=True, readonly=True)
+    account_id = fields.Many2one('social.hub.account', readonly=True)
+    attempt_no = fields.Integer(readonly=True)
+    outcome = fields.Selection(
+        [
+            ('posted', 'Posted'),
+            ('container_pending', 'Container Pending'),
+            ('permanent', 'Permanent Error'),
+            ('transient', 'Transient Error'),
+            ('throttled', 'Throttled'),
+        ],
+        required=True,
+        readonly=True,
+    )
+    error_message = fields.Char(readonly=True)
+    payload = fields.Json(readonly=True)
+    started_at = fields.Datetime(required=True, readonly=True, index=True)
+    duration_ms = fields.Integer(readonly=True, aggregator='avg')
+    payload_text = fields.Text(compute='_compute_payload_text')
+
+    @api.depends('payload')
+    def _compute_payload_text(self):
+        for attempt in self:
+            attempt.payload_text = json.dumps(attempt.payload, indent=2, default=str) if attempt.payload else False
+
+    def init(self):
+        if self.env.cr._cnx.server_version < 140000:
+            return
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute('ALTER TABLE social_hub_publish_attempt ALTER COLUMN payload SET COMPRESSION lz4')
+        except Exception as exc:
+            _logger.info('Social Hub publish attempt payloads keep the default compression: %s', exc)
+
+    @api.model
+    def _log(self, post, outcome, payload, attempt_no, duration_ms=0, error=False):
+        return self.sudo().create({
+            'post_id': post.id,
+            'account_id': post.account_id.id,
+            'attempt_no': attempt_no,
+            'outcome': outcome,
+            'error_message': error[:ATTEMPT_ERROR_MAX_LENGTH] if error else False,
+            'payload': payload,
+            'started_at': fields.Datetime.now() - timedelta(milliseconds=duration_ms),
+            'duration_ms': duration_ms,
+        })
+
+    @api.model
+    def cron_purge(self):
+        retention_days = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.publish_attempt_retention_days', 30)))
+        self.flush_model()
+        self.env['social.hub.post'].flush_model(['last_attempt_id'])
+        self.env.cr.execute("""
+            DELETE FROM social_hub_publish_attempt attempt
+             WHERE attempt.started_at < %s
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM social_hub_post post
+                     WHERE post.last_attempt_id = attempt.id
+               )
+        """, (fields.Datetime.now() - timedelta(days=retention_days),))
+        self.invalidate_model()
@@ -0,0 +1,227 @@
+import json
+import threading
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+THROTTLE_ERROR_CODES = {4, 17, 32, 613, 80001, 80002, 80004, 80005, 80006, 80008, 80014}
+USAGE_WINDOW_MINUTES = 60
+
+_observations_lock = threading.Lock()
+_observations = {}
+
+
+def _usage_values(data, observed_at):
+    if not isinstance(data, dict):
+        return None
+    usage = max(
+        float(data.get('call_count') or 0),
+        float(data.get('total_time') or 0),
+        float(data.get('total_cputime') or 0),
+    )
+    regain_minutes = int(data.get('estimated_time_to_regain_access') or 0)
+    return {
+        'call_count_pct': float(data.get('call_count') or 0),
+        'total_time_pct': float(data.get('total_time') or 0),
+        'total_cputime_pct': float(data.get('total_cputime') or 0),
+        'usage_pct': usage,
+        'regain_at': observed_at + timedelta(minutes=regain_minutes) if regain_minutes else None,
+        'observed_at': observed_at,
+    }
+
+
+def _load_header(headers, name):
+    raw = headers.get(name)
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def record_usage_headers(headers, app_id=None, object_id=None):
+    observed_at = fields.Datetime.now()
+    observations = {}
+
+    app_usage = _usage_values(_load_header(headers, 'X-App-Usage'), observed_at)
+    if app_usage and app_id:
+        observations[f'app:{app_id}'] = dict(app_usage, scope='app')
+
+    page_usage = _usage_values(_load_header(headers, 'X-Page-Usage'), observed_at)
+    if page_usage and object_id:
+        observations[f'object:{object_id}'] = dict(page_usage, scope='object')
+
+    business_usage = _load_header(headers, 'X-Business-Use-Case-Usage') or {}
+    if isinstance(business_usage, dict):
+        for business_id, entries in business_usage.items():
+            for entry in entries if isinstance(entries, list) else [entries]:
+                values = _usage_values(entry, observed_at)
+                key = f'object:{business_id}'
+                if values and values['usage_pct'] >= observations.get(key, {}).get('usage_pct', -1):
+                    observations[key] = dict(values, scope='object')
+
+    if observations:
+        with _observations_lock:
+            _observations.update(observations)
+    return observations
+
+
+def record_throttled(app_id=None, object_id=None, regain_minutes=0):
+    observed_at = fields.Datetime.now()
+    values = {
+        'call_count_pct': 100.0,
+        'total_time_pct': 100.0,
+        'total_cputime_pct': 100.0,
+        'usage_pct': 100.0,
+        'regain_at': observed_at + timedelta(minutes=regain_minutes) if regain_minutes else None,
+        'observed_at': observed_at,
+    }
+    with _observations_lock:
+        if app_id:
+            _observations[f'app:{app_id}'] = dict(values, scope='app')
+        if object_id:
+            _observations[f'object:{object_id}'] = dict(values, scope='object')
+
+
+def pop_observations():
+    with _observations_lock:
+        observations = dict(_observations)
+        _observations.clear()
+    return observations
+
+
+class SocialHubRateLimit(models.Model):
+    _name = 'social.hub.rate.limit'
+    _description = 'Social Hub Meta Rate Limit Budget'
+    _order = 'usage_pct desc, key'
+    _rec_name = 'key'
+
+    key = fields.Char(required=True, readonly=True)
+    scope = fields.Selection([('app', 'App'), ('object', 'Page / Instagram User')], required=True, readonly=True)
+    call_count_pct = fields.Float(readonly=True)
+    total_time_pct = fields.Float(readonly=True)
+    total_cputime_pct = fields.Float(readonly=True)
+    usage_pct = fields.Float(readonly=True, help='Highest of the three usage percentages reported by Meta.')
+    regain_at = fields.Datetime(readonly=True, help='Meta asked us not to call again before this time.')
+    observed_at = fields.Datetime(readonly=True)
+    tokens = fields.Float(readonly=True, digits=(16, 2), help='Dispatch tokens left in the bucket after the last refill.')
+    refilled_at = fields.Datetime(readonly=True)
+
+    _rate_limit_key_unique = models.Constraint(
+        'UNIQUE(key)',
+        'Rate limit keys must be unique.',
+    )
+
+    @api.model
+    def _get_budget_settings(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        target_pct = min(100.0, max(1.0, float(get_param('social_hub.rate_limit_target_pct', 80))))
+        return {
+            'target_pct': target_pct,
+            'pace_margin_pct': min(target_pct, max(1.0, float(get_param('social_hub.rate_limit_pace_margin_pct', 20)))),
+            'bucket_size': max(1, int(get_param('social_hub.rate_limit_bucket_size', 20))),
+            'refill_per_minute': max(0.1, float(get_param('social_hub.rate_limit_refill_per_minute', 10))),
+            'throttle_backoff_minutes': max(1, int(get_param('social_hub.rate_limit_backoff_minutes', 15))),
+        }
+
+    @api.model
+    def _flush_observations(self):
+        self.env['social.hub.metric.value'].sudo()._flush()
+        observations = pop_observations()
+        if not observations:
+            return
+        for key, values in observations.items():
+            self.env.cr.execute("""
+                INSERT INTO social_hub_rate_limit (
+                    key, scope, call_count_pct, total_time_pct, total_cputime_pct, usage_pct, regain_at, observed_at,
+                    create_uid, create_date, write_uid, write_date
+                )
+                VALUES (
+                    %(key)s, %(scope)s, %(call_count_pct)s, %(total_time_pct)s, %(total_cputime_pct)s, %(usage_pct)s,
+                    %(regain_at)s, %(observed_at)s, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                )
+                ON CONFLICT (key) DO UPDATE
+                   SET scope = EXCLUDED.scope,
+                       call_count_pct = EXCLUDED.call_count_pct,
+                       total_time_pct = EXCLUDED.total_time_pct,
+                       total_cputime_pct = EXCLUDED.total_cputime_pct,
+                       usage_pct = EXCLUDED.usage_pct,
+                       regain_at = EXCLUDED.regain_at,
+                       observed_at = EXCLUDED.observed_at,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+                 WHERE social_hub_rate_limit.observed_at IS NULL
+                    OR social_hub_rate_limit.observed_at <= EXCLUDED.observed_at
+            """, dict(values, key=key, uid=self.env.uid))
+        self.invalidate_model()
+
+    def _effective_usage(self, now):
+        self.ensure_one()
+        if not self.observed_at:
+            return 0.0
+        age_minutes = (now - self.observed_at).total_seconds() / 60.0
+        return self.usage_pct * max(0.0, 1.0 - age_minutes / USAGE_WINDOW_MINUTES)
+
+    def _refill_rate(self, usage, settings):
+        self.ensure_one()
+        if not self.observed_at:
+            return settings['refill_per_minute']
+        headroom = settings['target_pct'] - usage
+        if headroom > settings['pace_margin_pct']:
+            return None
+        return settings['bucket_size'] * max(0.0, headroom) / settings['pace_margin_pct']
+
+    @api.model
+    def _lock_buckets(self, keys):
+        keys = sorted(keys)
+        if not keys:
+            return self.browse()
+        self.env.cr.execute("""
+            INSERT INTO social_hub_rate_limit (key, scope, create_uid, create_date, write_uid, write_date)
+                 SELECT key, CASE WHEN key LIKE 'app:%%' THEN 'app' ELSE 'object' END,
+                        %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                   FROM unnest(%(keys)s::varchar[]) AS key
+            ON CONFLICT (key) DO NOTHING
+        """, {'keys': keys, 'uid': self.env.uid})
+        self.env.cr.execute(
+            'SELECT id FROM social_hub_rate_limit WHERE key = ANY(%s) ORDER BY key FOR UPDATE',
+            (keys,),
+        )
+        limits = self.browse([row[0] for row in self.env.cr.fetchall()])
+        limits.invalidate_recordset()
+        return limits
+
+    @api.model
+    def _get_dispatch_budget(self, keys):
+        settings = self._get_budget_settings()
+        now = fields.Datetime.now()
+        budget = {}
+        for limit in self.sudo()._lock_buckets(keys):
+            usage = limit._effective_usage(now)
+            capacity = settings['bucket_size'] * max(0.0, settings['target_pct'] - usage) / settings['target_pct']
+            refill_rate = limit._refill_rate(usage, settings)
+            if refill_rate is None:
+                tokens = float('inf')
+            elif limit.refilled_at:
+                elapsed_minutes = max(0.0, (now - limit.refilled_at).total_seconds() / 60.0)
+                tokens = min(capacity, limit.tokens + elapsed_minutes * refill_rate)
+            else:
+                tokens = capacity
+            resume_at = False
+            if limit.regain_at and limit.regain_at > now:
+                tokens, resume_at = 0.0, limit.regain_at
+            elif capacity < 1:
+                excess = usage - settings['target_pct'] + 1
+                minutes = max(1, int(USAGE_WINDOW_MINUTES * excess / max(limit.usage_pct, 1.0)))
+                resume_at = now + timedelta(minutes=minutes)
+            elif tokens < 1:
+                resume_at = now + timedelta(minutes=(1 - tokens) / refill_rate)
+            budget[limit.key] = {'tokens': tokens, 'capacity': capacity, 'resume_at': resume_at, 'limit': limit}
+        return budget
+
+    @api.model
+    def _store_dispatch_budget(self, budget):
+        now = fields.Datetime.now()
+        for values in budget.values():
+            values['limit'].write({'tokens': max(0.0, min(values['tokens'], values['capacity'])), 'refilled_at': now})
@@ -0,0 +1,44 @@
+import random
+from datetime import timedelta
+
+from odoo.exceptions import UserError
+
+from .social_hub_meta_graph import MetaGraphError
+from .social_hub_rate_limit import THROTTLE_ERROR_CODES
+
+ERROR_PERMANENT = 'permanent'
+ERROR_TRANSIENT = 'transient'
+ERROR_THROTTLED = 'throttled'
+
+THROTTLE_SUBCODES = {2207042, 2207051}
+ACCOUNT_ERROR_CODES = {10, 102, 190} | set(range(200, 300))
+TRANSIENT_ERROR_CODES = {1, 2}
+TRANSIENT_SUBCODES = {2207001, 2207003, 2207020, 2207032, 2207052, 2207053}
+TRANSIENT_ERROR_TYPES = {'ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout', 'BatchTimeout', 'InvalidJSON'}
+
+
+def classify_publish_error(exc):
+    if isinstance(exc, MetaGraphError):
+        if exc.code in THROTTLE_ERROR_CODES or exc.subcode in THROTTLE_SUBCODES:
+            return ERROR_THROTTLED
+        if exc.code in ACCOUNT_ERROR_CODES:
+            return ERROR_PERMANENT
+        if exc.error.get('is_transient') or exc.code in TRANSIENT_ERROR_CODES or exc.subcode in TRANSIENT_SUBCODES:
+            return ERROR_TRANSIENT
+        if exc.error.get('type') in TRANSIENT_ERROR_TYPES or (exc.status_code or 0) >= 500:
+            return ERROR_TRANSIENT
+        if exc.code is not None or (exc.status_code and exc.status_code < 500):
+            return ERROR_PERMANENT
+        return ERROR_TRANSIENT
+    if isinstance(exc, UserError):
+        return ERROR_PERMANENT
+    return ERROR_TRANSIENT
+
+
+def is_account_error(exc):
+    return isinstance(exc, MetaGraphError) and exc.code in ACCOUNT_ERROR_CODES
+
+
+def backoff_delay(base_minutes, attempt, max_minutes):
+    ceiling = min(max_minutes, max(1, base_minutes) * (2 ** max(0, attempt - 1)))
+    return timedelta(seconds=random.uniform(ceiling * 30, ceiling * 60))
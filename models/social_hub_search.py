@@ -0,0 +1,106 @@
+from odoo import api, models
+
+from .social_hub_tag import TAG_RE, TSV_CONFIG, extract_tags
+
+SEARCH_MAX_LIMIT = 200
+SEARCH_SOURCES = ('post', 'item')
+
+
+class SocialHubSearch(models.AbstractModel):
+    _name = 'social.hub.search'
+    _description = 'Social Hub Content Search'
+
+    @api.model
+    def _split_query(self, query):
+        return ' '.join(TAG_RE.sub(' ', query or '').split()), sorted(extract_tags(query))
+
+    @api.model
+    def _source_sql(self, source, text, tag_ids):
+        if source == 'post':
+            table, rel_table, rel_column = 'social_hub_post', 'social_hub_post_tag_rel', 'post_id'
+            name_sql, date_sql, model = 'record.name', 'COALESCE(record.posted_at, record.create_date)', 'social.hub.post'
+        else:
+            table, rel_table, rel_column = 'social_hub_stream_item', 'social_hub_stream_item_tag_rel', 'item_id'
+            name_sql, date_sql, model = 'COALESCE(record.author, record.external_id)', 'COALESCE(record.published_at, record.fetched_at)', 'social.hub.stream.item'
+
+        conditions = ['(record.company_id = ANY(%(company_ids)s) OR record.company_id IS NULL)']
+        if text:
+            conditions.append('record.message_tsv @@ search.query')
+        if tag_ids:
+            conditions.append(f"""record.id IN (
+                    SELECT {rel_column}
+                      FROM {rel_table}
+                     WHERE tag_id = ANY(%(tag_ids)s)
+                  GROUP BY {rel_column}
+                    HAVING COUNT(*) = %(tag_count)s
+            )""")
+        rank_sql = 'ts_rank_cd(record.message_tsv, search.query)' if text else '0.0'
+        return f"""
+            SELECT '{model}' AS model,
+                   record.id AS id,
+                   {name_sql} AS name,
+                   record.message AS message,
+                   {rank_sql} AS rank,
+                   {date_sql} AS date
+              FROM {table} record, search
+             WHERE {' AND '.join(conditions)}
+        """
+
+    @api.model
+    def search_content(self, query, limit=20, offset=0, sources=SEARCH_SOURCES):
+        text, tag_names = self._split_query(query)
+        limit = max(1, min(int(limit or 20), SEARCH_MAX_LIMIT))
+        offset = max(0, int(offset or 0))
+        empty = {'results': [], 'limit': limit, 'offset': offset, 'has_more': False}
+
+        sources = [source for source in sources if source in SEARCH_SOURCES]
+        if 'post' in sources:
+            self.env['social.hub.post'].check_access('read')
+        if 'item' in sources:
+            self.env['social.hub.stream.item'].check_access('read')
+        if not sources or (not text and not tag_names):
+            return empty
+
+        tag_ids = []
+        if tag_names:
+            tags = self.env['social.hub.tag'].sudo().search([('name', 'in', tag_names)])
+            if len(tags) < len(tag_names):
+                return empty
+            tag_ids = tags.ids
+
+        self.env['social.hub.post'].flush_model()
+        self.env['social.hub.stream.item'].flush_model()
+        union_sql = ' UNION ALL '.join(self._source_sql(source, text, tag_ids) for source in sources)
+        self.env.cr.execute(f"""
+            WITH search AS (SELECT websearch_to_tsquery('{TSV_CONFIG}', %(text)s) AS query),
+                 hits AS (
+                    {union_sql}
+                 ORDER BY rank DESC, date DESC NULLS LAST, id DESC
+                    LIMIT %(limit)s
+                   OFFSET %(offset)s
+                 )
+            SELECT hits.model,
+                   hits.id,
+                   hits.name,
+                   hits.rank,
+                   hits.date,
+                   CASE WHEN %(text)s = '' THEN left(hits.message, 200)
+                        ELSE ts_headline('{TSV_CONFIG}', coalesce(hits.message, ''), search.query, 'MaxFragments=1, MinWords=5, MaxWords=25')
+                   END AS snippet
+              FROM hits, search
+          ORDER BY hits.rank DESC, hits.date DESC NULLS LAST, hits.id DESC
+        """, {
+            'text': text,
+            'company_ids': self.env.companies.ids,
+            'tag_ids': tag_ids,
+            'tag_count': len(tag_ids),
+            'limit': limit + 1,
+            'offset': offset,
+        })
+        rows = self.env.cr.dictfetchall()
+        return {
+            'results': rows[:limit],
+            'limit': limit,
+            'offset': offset,
+            'has_more': len(rows) > limit,
+        }
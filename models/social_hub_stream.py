@@ -1,4 +1,26 @@
-from odoo import fields, models
+import logging
+from datetime import datetime, timedelta, timezone
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+STREAM_PAGE_SIZE = 50
+STREAM_MAX_PAGES_PER_FETCH = 10
+FACEBOOK_STREAM_FIELDS = 'id,message,created_time,permalink_url,from{name},full_picture'
+INSTAGRAM_STREAM_FIELDS = 'id,caption,timestamp,permalink,media_url,username'
+INSTAGRAM_HASHTAG_FIELDS = 'id,caption,timestamp,permalink,media_url'
+
+
+def _parse_graph_datetime(value):
+    if not value:
+        return False
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z')
+    except ValueError:
+        return False
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class SocialHubStream(models.Model):
@@ -32,12 +54,199 @@ class SocialHubStream(models.Model):
 
     last_fetch_at = fields.Datetime(readonly=True)
     last_item_count = fields.Integer(readonly=True, default=0)
+    last_fetch_error = fields.Text(readonly=True)
     note = fields.Text()
 
+    fetch_interval_minutes = fields.Integer(default=15)
+    next_fetch_at = fields.Datetime(readonly=True, index=True, copy=False)
+    since_cursor = fields.Datetime(readonly=True, copy=False, help='Newest item time already ingested.')
+    pending_since_cursor = fields.Datetime(readonly=True, copy=False)
+    paging_cursor = fields.Char(readonly=True, copy=False, help='Graph "after" cursor of a backlog still being drained.')
+    external_ref = fields.Char(readonly=True, copy=False, help='Resolved provider id for the query, e.g. the hashtag id.')
+
+    item_ids = fields.One2many('social.hub.stream.item', 'stream_id')
+    item_count = fields.Integer(compute='_compute_item_count')
+
+    def _compute_item_count(self):
+        counts = dict(self.env['social.hub.stream.item']._read_group(
+            [('stream_id', 'in', self.ids)], ['stream_id'], ['__count'],
+        ))
+        for stream in self:
+            stream.item_count = counts.get(stream, 0)
+
+    def write(self, vals):
+        if {'query', 'stream_type', 'account_id'} & set(vals):
+            vals = dict(vals, since_cursor=False, pending_since_cursor=False, paging_cursor=False, external_ref=False)
+        return super().write(vals)
+
     def action_refresh_stream(self):
-        now = fields.Datetime.now()
         for stream in self:
-            stream.write({
-                'last_fetch_at': now,
-                'last_item_count': stream.last_item_count + 1,
-            })
+            stream._refresh_items()
+
+    def action_reset_cursors(self):
+        self.write({
+            'since_cursor': False,
+            'pending_since_cursor': False,
+            'paging_cursor': False,
+            'external_ref': False,
+            'next_fetch_at': False,
+        })
+
+    def action_view_items(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Stream Items'),
+            'res_model': 'social.hub.stream.item',
+            'view_mode': 'list,form',
+            'domain': [('stream_id', '=', self.id)],
+            'context': {'default_stream_id': self.id},
+        }
+
+    def _refresh_items(self):
+        self.ensure_one()
+        now = fields.Datetime.now()
+        items_vals, cursor_vals = self._fetch_new_items()
+        items = self.env['social.hub.stream.item']._ingest(self, items_vals)
+        self.write(dict(
+            cursor_vals,
+            last_fetch_at=now,
+            last_item_count=len(items),
+            last_fetch_error=False,
+            next_fetch_at=now + timedelta(minutes=max(1, self.fetch_interval_minutes or 15)),
+        ))
+        return items
+
+    def _meta_stream_source(self):
+        account = self.account_id
+        uid = account.external_uid
+        graph_base = account._meta_graph_base()
+
+        if account.platform_code == 'facebook':
+            if self.stream_type == 'profile':
+                return f'{graph_base}/{uid}/feed', {'fields': FACEBOOK_STREAM_FIELDS}, True
+            if self.stream_type == 'mention':
+                return f'{graph_base}/{uid}/tagged', {'fields': FACEBOOK_STREAM_FIELDS}, True
+        elif account.platform_code == 'instagram':
+            if self.stream_type == 'profile':
+                return f'{graph_base}/{uid}/media', {'fields': INSTAGRAM_STREAM_FIELDS}, False
+            if self.stream_type == 'mention':
+                return f'{graph_base}/{uid}/tags', {'fields': INSTAGRAM_STREAM_FIELDS}, False
+            if self.stream_type == 'hashtag':
+                hashtag_id = self._meta_resolve_hashtag()
+                return (
+                    f'{graph_base}/{hashtag_id}/recent_media',
+                    {'fields': INSTAGRAM_HASHTAG_FIELDS, 'user_id': uid},
+                    False,
+                )
+        raise UserError(_('Stream type %(type)s is not supported for %(platform)s accounts.',
+                          type=self.stream_type, platform=account.platform_id.name))
+
+    def _meta_resolve_hashtag(self):
+        if self.external_ref:
+            return self.external_ref
+        hashtag = (self.query or '').strip().lstrip('#')
+        if not hashtag:
+            raise UserError(_('Hashtag streams need a query.'))
+        account = self.account_id.sudo()
+        data = account._meta_graph()._get(
+            f'{account._meta_graph_base()}/ig_hashtag_search',
+            params={'user_id': account.external_uid, 'q': hashtag, 'access_token': account.access_token},
+            error_message=_('Instagram hashtag search failed: %s'),
+        )
+        results = data.get('data') or []
+        if not results:
+            raise UserError(_('Instagram hashtag #%s was not found.') % hashtag)
+        self.external_ref = results[0]['id']
+        return self.external_ref
+
+    def _meta_item_vals(self, raw):
+        author = raw.get('username') or (raw.get('from') or {}).get('name')
+        return {
+            'external_id': raw.get('id'),
+            'author': author or False,
+            'message': raw.get('message') or raw.get('caption') or False,
+            'permalink': raw.get('permalink_url') or raw.get('permalink') or False,
+            'media_url': raw.get('full_picture') or raw.get('media_url') or False,
+            'published_at': _parse_graph_datetime(raw.get('created_time') or raw.get('timestamp')),
+        }
+
+    def _fetch_new_items(self):
+        self.ensure_one()
+        account = self.account_id.sudo()
+        if account.platform_code not in ('facebook', 'instagram'):
+            raise UserError(_('Stream ingestion currently supports Facebook and Instagram only.'))
+        if not account.access_token or not account.external_uid:
+            raise UserError(_('Account is not connected to Meta.'))
+
+        url, params, supports_since = self._meta_stream_source()
+        params = dict(params, limit=STREAM_PAGE_SIZE, access_token=account.access_token)
+        if supports_since and self.since_cursor:
+            params['since'] = int(self.since_cursor.replace(tzinfo=timezone.utc).timestamp())
+        if self.paging_cursor:
+            params['after'] = self.paging_cursor
+
+        graph = account._meta_graph()
+        newest = self.pending_since_cursor or False
+        items_vals = []
+        after = False
+        reached_known = False
+        for dummy in range(STREAM_MAX_PAGES_PER_FETCH):
+            data = graph._get(url, params=params, error_message=_('Stream fetch failed: %s'))
+            for raw in data.get('data') or []:
+                vals = self._meta_item_vals(raw)
+                published_at = vals['published_at']
+                if self.since_cursor and published_at and published_at <= self.since_cursor:
+                    reached_known = True
+                    break
+                if published_at and (not newest or published_at > newest):
+                    newest = published_at
+                items_vals.append(vals)
+            paging = data.get('paging') or {}
+            after = (paging.get('cursors') or {}).get('after') if paging.get('next') else False
+            if reached_known or not after:
+                after = False
+                break
+            params['after'] = after
+
+        if after:
+            return items_vals, {'paging_cursor': after, 'pending_since_cursor': newest}
+        return items_vals, {
+            'paging_cursor': False,
+            'pending_since_cursor': False,
+            'since_cursor': newest or self.since_cursor,
+        }
+
+    @api.model
+    def cron_refresh_due_streams(self, limit=None):
+        run_start = self.env['social.hub.cron.run']._start()
+        limit = limit or max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.stream_batch_size', 50)))
+        now = fields.Datetime.now()
+        streams = self.sudo().search([
+            ('account_id.state', '=', 'connected'),
+            ('stream_type', 'in', ['profile', 'hashtag', 'mention']),
+            '|', ('next_fetch_at', '=', False), ('next_fetch_at', '<=', now),
+        ], order='next_fetch_at asc nulls first, id', limit=limit)
+        oldest_due_at = min((stream.next_fetch_at for stream in streams if stream.next_fetch_at), default=False)
+        failure_count = 0
+        for stream in streams:
+            try:
+                with self.env.cr.savepoint():
+                    stream._refresh_items()
+            except Exception as exc:
+                failure_count += 1
+                _logger.warning('Social Hub stream %s refresh failed: %s', stream.id, exc)
+                stream.write({
+                    'last_fetch_at': now,
+                    'last_fetch_error': str(exc),
+                    'next_fetch_at': now + timedelta(minutes=max(1, stream.fetch_interval_minutes or 15)),
+                })
+        if streams:
+            self.env['social.hub.cron.run']._record(
+                'refresh_streams',
+                run_start,
+                batch_size=len(streams),
+                success_count=len(streams) - failure_count,
+                failure_count=failure_count,
+                lag_seconds=max(0.0, (now - oldest_due_at).total_seconds()) if oldest_due_at else 0.0,
+            )
@@ -0,0 +1,68 @@
+from odoo import api, fields, models
+
+from .social_hub_tag import ensure_message_tsv
+
+
+class SocialHubStreamItem(models.Model):
+    _name = 'social.hub.stream.item'
+    _description = 'Social Hub Stream Item'
+    _order = 'published_at desc, id desc'
+    _rec_name = 'external_id'
+
+    stream_id = fields.Many2one('social.hub.stream', required=True, ondelete='cascade', index=True, readonly=True)
+    account_id = fields.Many2one(related='stream_id.account_id', store=True, readonly=True)
+    platform_id = fields.Many2one(related='stream_id.platform_id', store=True, readonly=True)
+    company_id = fields.Many2one(related='stream_id.company_id', store=True, readonly=True)
+    stream_type = fields.Selection(related='stream_id.stream_type', readonly=True)
+
+    external_id = fields.Char(required=True, readonly=True)
+    author = fields.Char(readonly=True)
+    message = fields.Text(readonly=True, index='trigram')
+    tag_ids = fields.Many2many(
+        'social.hub.tag',
+        'social_hub_stream_item_tag_rel',
+        'item_id',
+        'tag_id',
+        string='Tags',
+        compute='_compute_tag_ids',
+        store=True,
+        readonly=True,
+    )
+    permalink = fields.Char(readonly=True)
+    media_url = fields.Char(readonly=True)
+    published_at = fields.Datetime(readonly=True, index=True)
+    fetched_at = fields.Datetime(readonly=True, default=fields.Datetime.now)
+
+    _stream_external_unique = models.Constraint(
+        'UNIQUE(stream_id, external_id)',
+        'This item was already ingested for this stream.',
+    )
+
+    def init(self):
+        ensure_message_tsv(self.env.cr, self._table)
+
+    @api.depends('message')
+    def _compute_tag_ids(self):
+        self.env['social.hub.tag']._assign_from_messages(self)
+
+    @api.model
+    def _ingest(self, stream, items_vals):
+        if not items_vals:
+            return self.browse()
+        self.env.cr.execute('SELECT pg_advisory_xact_lock(hashtext(%s), %s)', (self._name, stream.id))
+
+        by_external_id = {}
+        for vals in items_vals:
+            if vals.get('external_id'):
+                by_external_id.setdefault(vals['external_id'], vals)
+
+        existing = set(self.sudo().search([
+            ('stream_id', '=', stream.id),
+            ('external_id', 'in', list(by_external_id)),
+        ]).mapped('external_id'))
+        create_vals = [
+            dict(vals, stream_id=stream.id)
+            for external_id, vals in by_external_id.items()
+            if external_id not in existing
+        ]
+        return self.sudo().create(create_vals) if create_vals else self.browse()
@@ -0,0 +1,56 @@
+import re
+
+from odoo import api, fields, models
+
+TAG_RE = re.compile(r'(?<![\w#@])([#@])(\w{1,100})')
+TSV_CONFIG = 'simple'
+
+
+def extract_tags(text):
+    return {f'{prefix}{name.lower()}' for prefix, name in TAG_RE.findall(text or '')}
+
+
+def ensure_message_tsv(cr, table):
+    cr.execute(f"""
+        ALTER TABLE {table}
+        ADD COLUMN IF NOT EXISTS message_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('{TSV_CONFIG}', coalesce(message, ''))) STORED
+    """)
+    cr.execute(f'CREATE INDEX IF NOT EXISTS {table}_message_tsv_idx ON {table} USING gin (message_tsv)')
+
+
+class SocialHubTag(models.Model):
+    _name = 'social.hub.tag'
+    _description = 'Social Hub Hashtag / Mention'
+    _order = 'name'
+
+    name = fields.Char(required=True, readonly=True)
+    tag_type = fields.Selection([('hashtag', 'Hashtag'), ('mention', 'Mention')], readonly=True)
+    post_ids = fields.Many2many('social.hub.post', 'social_hub_post_tag_rel', 'tag_id', 'post_id', readonly=True)
+    stream_item_ids = fields.Many2many(
+        'social.hub.stream.item', 'social_hub_stream_item_tag_rel', 'tag_id', 'item_id', readonly=True,
+    )
+
+    _name_unique = models.Constraint('UNIQUE(name)', 'This tag already exists.')
+
+    @api.model
+    def _get_or_create(self, names):
+        names = sorted(set(names))
+        if not names:
+            return self.browse()
+        self.env.cr.execute("""
+            INSERT INTO social_hub_tag (name, tag_type)
+                 SELECT name, CASE WHEN name LIKE '@%%' THEN 'mention' ELSE 'hashtag' END
+                   FROM unnest(%s::varchar[]) AS name
+            ON CONFLICT (name) DO NOTHING
+        """, (names,))
+        self.env.cr.execute('SELECT id FROM social_hub_tag WHERE name = ANY(%s)', (names,))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _assign_from_messages(self, records):
+        names_by_record = {record: extract_tags(record.message) for record in records}
+        tags = self.sudo()._get_or_create(set().union(*names_by_record.values())) if names_by_record else self.browse()
+        tags_by_name = {tag.name: tag for tag in tags}
+        for record, names in names_by_record.items():
+            record.tag_ids = self.browse([tags_by_name[name].id for name in names if name in tags_by_name])
@@ -0,0 +1,216 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+WEBHOOK_TRIGGER_INTERVAL_SECONDS = 5
+FACEBOOK_FEED_ITEMS = ('post', 'status', 'photo', 'video', 'share')
+
+_last_trigger = {'at': 0.0}
+
+
+def _webhook_datetime(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str) and value.isdigit():
+        return datetime.fromtimestamp(int(value), timezone.utc).replace(tzinfo=None)
+    return fields.Datetime.now()
+
+
+class SocialHubWebhookEvent(models.Model):
+    _name = 'social.hub.webhook.event'
+    _description = 'Social Hub Webhook Inbox'
+    _order = 'id desc'
+    _log_access = False
+
+    object_type = fields.Char(readonly=True)
+    payload = fields.Text(readonly=True)
+    state = fields.Selection(
+        [('pending', 'Pending'), ('done', 'Done'), ('error', 'Error')],
+        default='pending',
+        required=True,
+        readonly=True,
+    )
+    received_at = fields.Datetime(default=fields.Datetime.now, readonly=True)
+    processed_at = fields.Datetime(readonly=True)
+    item_count = fields.Integer(readonly=True)
+    error = fields.Text(readonly=True)
+
+    _pending_idx = models.Index("(id) WHERE state = 'pending'")
+
+    @api.model
+    def _enqueue(self, body):
+        try:
+            object_type = json.loads(body).get('object')
+        except (ValueError, AttributeError):
+            object_type = False
+        event = self.sudo().create({
+            'object_type': object_type or False,
+            'payload': body.decode() if isinstance(body, bytes) else body,
+        })
+        self._trigger_inbox()
+        return event
+
+    @api.model
+    def _trigger_inbox(self):
+        now = time.monotonic()
+        next_allowed = _last_trigger['at'] + WEBHOOK_TRIGGER_INTERVAL_SECONDS
+        if _last_trigger['at'] > now:
+            return
+        cron = self.env.ref('social_hub.ir_cron_social_hub_webhook_inbox', raise_if_not_found=False)
+        if not cron:
+            return
+        if now >= next_allowed:
+            _last_trigger['at'] = now
+            cron.sudo()._trigger()
+        else:
+            _last_trigger['at'] = next_allowed
+            cron.sudo()._trigger(at=fields.Datetime.now() + timedelta(seconds=next_allowed - now))
+
+    @api.model
+    def _claim_pending(self, limit):
+        self.env.cr.execute("""
+            SELECT id
+              FROM social_hub_webhook_event
+             WHERE state = 'pending'
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, (limit,))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _extract_changes(self):
+        changes = []
+        malformed = {}
+        for event in self:
+            try:
+                changes += event._event_changes()
+            except (ValueError, TypeError, AttributeError) as exc:
+                malformed[event.id] = f'Malformed webhook payload: {exc}'
+        return changes, malformed
+
+    def _event_changes(self):
+        self.ensure_one()
+        payload = json.loads(self.payload or '{}')
+        if not isinstance(payload, dict):
+            raise ValueError('payload is not an object')
+        changes = []
+        for entry in payload.get('entry') or []:
+            for change in entry.get('changes') or []:
+                stream_type, vals = self._change_to_item(payload.get('object'), entry.get('time'), change)
+                if vals and vals.get('external_id'):
+                    changes.append((self, str(entry.get('id')), stream_type, vals))
+        return changes
+
+    @api.model
+    def _change_to_item(self, object_type, entry_time, change):
+        field = change.get('field')
+        value = change.get('value') or {}
+        if object_type == 'page' and field == 'feed':
+            if value.get('item') not in FACEBOOK_FEED_ITEMS or value.get('verb') not in ('add', 'edited'):
+                return False, False
+            return 'profile', {
+                'external_id': value.get('post_id'),
+                'author': (value.get('from') or {}).get('name') or False,
+                'message': value.get('message') or False,
+                'published_at': _webhook_datetime(value.get('created_time') or entry_time),
+            }
+        if object_type == 'page' and field == 'mention':
+            if value.get('verb') != 'add':
+                return False, False
+            return 'mention', {
+                'external_id': value.get('post_id') or value.get('comment_id'),
+                'author': value.get('sender_name') or False,
+                'message': value.get('message') or False,
+                'published_at': _webhook_datetime(value.get('created_time') or entry_time),
+            }
+        if object_type == 'instagram' and field == 'mentions':
+            return 'mention', {
+                'external_id': value.get('comment_id') or value.get('media_id'),
+                'published_at': _webhook_datetime(entry_time),
+            }
+        if object_type == 'instagram' and field == 'comments':
+            return 'profile', {
+                'external_id': value.get('id'),
+                'author': (value.get('from') or {}).get('username') or False,
+                'message': value.get('text') or False,
+                'published_at': _webhook_datetime(entry_time),
+            }
+        return False, False
+
+    def _process(self):
+        changes, malformed = self._extract_changes()
+        entry_ids = {change[1] for change in changes}
+        streams = self.env['social.hub.stream'].sudo().search([
+            ('account_id.external_uid', 'in', list(entry_ids)),
+            ('stream_type', 'in', ['profile', 'mention']),
+        ])
+        streams_by_key = defaultdict(lambda: self.env['social.hub.stream'])
+        for stream in streams:
+            streams_by_key[(stream.account_id.external_uid, stream.stream_type)] |= stream
+
+        items_by_stream = defaultdict(list)
+        counts = defaultdict(int)
+        for event, entry_id, stream_type, vals in changes:
+            for stream in streams_by_key[(entry_id, stream_type)]:
+                items_by_stream[stream].append(vals)
+                counts[event.id] += 1
+
+        now = fields.Datetime.now()
+        fallback_minutes = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.webhook_fallback_poll_minutes', 360)))
+        for stream, items_vals in items_by_stream.items():
+            items = self.env['social.hub.stream.item']._ingest(stream, items_vals)
+            vals = {'next_fetch_at': max(stream.next_fetch_at or now, now + timedelta(minutes=fallback_minutes))}
+            if items:
+                vals.update(last_fetch_at=now, last_item_count=len(items))
+            stream.write(vals)
+
+        for event in self:
+            if event.id in malformed:
+                event.write({'state': 'error', 'processed_at': now, 'item_count': 0, 'error': malformed[event.id]})
+            else:
+                event.write({'state': 'done', 'processed_at': now, 'item_count': counts[event.id], 'error': False})
+        return len(malformed)
+
+    @api.model
+    def cron_process_inbox(self, limit=1000):
+        run_start = self.env['social.hub.cron.run']._start()
+        events = self._claim_pending(limit)
+        if not events:
+            return
+        oldest_received_at = min((event.received_at for event in events if event.received_at), default=False)
+        try:
+            with self.env.cr.savepoint():
+                failure_count = events._process()
+        except Exception:
+            _logger.exception('Social Hub webhook inbox batch failed, processing events one by one')
+            failure_count = 0
+            for event in events:
+                try:
+                    with self.env.cr.savepoint():
+                        failure_count += event._process()
+                except Exception as exc:
+                    _logger.warning('Social Hub webhook event %s failed: %s', event.id, exc)
+                    event.write({'state': 'error', 'processed_at': fields.Datetime.now(), 'error': str(exc)})
+                    failure_count += 1
+        self.env['social.hub.cron.run']._record(
+            'webhook_inbox',
+            run_start,
+            batch_size=len(events),
+            success_count=len(events) - failure_count,
+            failure_count=failure_count,
+            lag_seconds=max(0.0, (run_start[0] - oldest_received_at).total_seconds()) if oldest_received_at else 0.0,
+        )
+        if len(events) >= limit:
+            self.env.ref('social_hub.ir_cron_social_hub_webhook_inbox').sudo()._trigger()
+
+        retention_days = max(1, int(self.env['ir.config_parameter'].sudo().get_param('social_hub.webhook_retention_days', 7)))
+        self.env.cr.execute(
+            "DELETE FROM social_hub_webhook_event WHERE state = 'done' AND processed_at < %s",
+            (fields.Datetime.now() - timedelta(days=retention_days),),
+        )
@@ -0,0 +1,78 @@
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from markupsafe import Markup
+
+from odoo import api, models
+from odoo.tools import str2bool
+
+_logger = logging.getLogger(__name__)
+
+
+class SocialHubWorkerMixin(models.AbstractModel):
+    _name = 'social.hub.worker.mixin'
+    _description = 'Social Hub Worker Pool Mixin'
+
+    @api.model
+    def _run_in_worker_pool(self, jobs, method_name, max_workers=1, args=()):
+        jobs = [list(ids) for ids in jobs if ids]
+        if max_workers <= 1 or len(jobs) <= 1 or getattr(threading.current_thread(), 'testing', False):
+            for ids in jobs:
+                getattr(self.browse(ids), method_name)(*args)
+            return
+
+        self.env.flush_all()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix='social_hub') as executor:
+            futures = [executor.submit(self._worker_run_job, ids, method_name, args) for ids in jobs]
+            for future in futures:
+                future.result()
+
+    def _worker_run_job(self, ids, method_name, args):
+        registry = self.env.registry
+        uid, su = self.env.uid, self.env.su
+        context = dict(self.env.context, social_hub_worker=True)
+        threading.current_thread().dbname = registry.db_name
+        try:
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context, su=su)
+                getattr(env[self._name].browse(ids), method_name)(*args)
+        except Exception:
+            _logger.exception('Social Hub worker job %s on %s%s failed', method_name, self._name, ids)
+
+    def _worker_commit(self):
+        if self.env.context.get('social_hub_worker'):
+            self.env.cr.commit()
+
+    @api.model
+    def _is_high_volume_mode(self):
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param('social_hub.high_volume_mode', 'False'))
+
+    def _queue_write(self, vals):
+        if self._is_high_volume_mode():
+            return self.with_context(tracking_disable=True).write(vals)
+        return self.write(vals)
+
+    def _log_note(self, body):
+        if not self._is_high_volume_mode():
+            for record in self:
+                record.message_post(body=body)
+            return
+        key = f'social_hub.notes.{self._name}'
+        notes = self.env.cr.precommit.data.get(key)
+        if notes is None:
+            notes = self.env.cr.precommit.data[key] = defaultdict(list)
+            self.env.cr.precommit.add(self._flush_batched_notes)
+        for record in self:
+            notes[record.id].append(body)
+
+    def _flush_batched_notes(self):
+        notes = self.env.cr.precommit.data.pop(f'social_hub.notes.{self._name}', None)
+        if not notes:
+            return
+        records = self.env[self._name].sudo().browse(list(notes)).exists()
+        records._message_log_batch(bodies={
+            record.id: Markup('<br/>').join(notes[record.id])
+            for record in records
+        })
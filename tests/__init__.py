@@ -0,0 +1 @@
+from . import test_publish_queue
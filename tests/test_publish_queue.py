@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from odoo import SUPERUSER_ID, api, fields
+from odoo.sql_db import db_connect
+from odoo.tests import TransactionCase, tagged
+
+NO_TRACKING = {'tracking_disable': True, 'mail_create_nolog': True, 'mail_create_nosubscribe': True}
+
+
+@tagged('post_install', '-at_install')
+class TestPublishQueue(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, **NO_TRACKING))
+        cls.account = cls._create_account(cls.env, 'queue')
+        cls.parked_account = cls._create_account(cls.env, 'parked')
+        cls.parked_account.write({'publish_parked': True, 'publish_parked_at': fields.Datetime.now()})
+
+    @classmethod
+    def _create_account(cls, env, handle):
+        return env['social.hub.account'].create({
+            'name': f'Test {handle}',
+            'platform_id': env.ref('social_hub.platform_facebook').id,
+            'handle': f'@test_{handle}',
+            'external_uid': f'test-{handle}',
+            'state': 'connected',
+        })
+
+    def _create_post(self, account=None, **vals):
+        return self.env['social.hub.post'].create(dict({
+            'name': 'Queued post',
+            'account_id': (account or self.account).id,
+            'message': 'Hello',
+            'state': 'queued',
+        }, **vals))
+
+    def _claim(self, env=None):
+        return (env or self.env)['social.hub.post']._claim_publish_batch('test-owner', 1000)
+
+    def test_due_at_excludes_finished_posts(self):
+        now = fields.Datetime.now()
+        queued = self._create_post(next_retry_at=now)
+        transient = self._create_post(state='failed', attempt_count=1, last_error_class='transient', next_retry_at=now)
+        permanent = self._create_post(state='failed', attempt_count=1, last_error_class='permanent', next_retry_at=now)
+        exhausted = self._create_post(attempt_count=3, max_attempts=3, next_retry_at=now)
+        self.assertEqual(queued.due_at, now)
+        self.assertEqual(transient.due_at, now)
+        self.assertFalse(permanent.due_at)
+        self.assertFalse(exhausted.due_at)
+
+        claimed = self._claim()
+        self.assertIn(queued, claimed)
+        self.assertIn(transient, claimed)
+        self.assertNotIn(permanent, claimed)
+        self.assertNotIn(exhausted, claimed)
+
+    def test_claim_skips_parked_accounts(self):
+        post = self._create_post()
+        parked = self._create_post(account=self.parked_account)
+        claimed = self._claim()
+        self.assertIn(post, claimed)
+        self.assertNotIn(parked, claimed)
+        self.assertEqual(post.state, 'processing')
+        self.assertEqual(post.lease_owner, 'test-owner')
+        self.assertFalse(post.due_at)
+        self.assertEqual(parked.state, 'queued')
+
+    def test_claim_reclaims_expired_leases(self):
+        now = fields.Datetime.now()
+        expired = self._create_post(state='processing', lease_owner='dead-worker', lease_expires_at=now - timedelta(minutes=1))
+        leaseless = self._create_post(state='processing')
+        live = self._create_post(state='processing', lease_owner='live-worker', lease_expires_at=now + timedelta(minutes=10))
+        parked = self._create_post(
+            account=self.parked_account,
+            state='processing',
+            lease_owner='dead-worker',
+            lease_expires_at=now - timedelta(minutes=1),
+        )
+        claimed = self._claim()
+        self.assertIn(expired, claimed)
+        self.assertIn(leaseless, claimed)
+        self.assertNotIn(live, claimed)
+        self.assertNotIn(parked, claimed)
+        self.assertEqual(expired.lease_owner, 'test-owner')
+        self.assertGreater(expired.lease_expires_at, now)
+        self.assertEqual(live.lease_owner, 'live-worker')
+
+    def test_claim_skips_locked_rows(self):
+        dbname = self.env.cr.dbname
+        setup_cr = db_connect(dbname).cursor()
+        try:
+            env = api.Environment(setup_cr, SUPERUSER_ID, NO_TRACKING)
+            account = self._create_account(env, 'locked')
+            posts = env['social.hub.post'].create([{
+                'name': f'Locked test {index}',
+                'account_id': account.id,
+                'message': 'Hello',
+                'state': 'queued',
+            } for index in range(2)])
+            locked_id, free_id = posts.ids
+            account_id = account.id
+            setup_cr.commit()
+        finally:
+            setup_cr.close()
+        self.addCleanup(self._delete_committed, dbname, [locked_id, free_id], account_id)
+
+        locker_cr = db_connect(dbname).cursor()
+        claimer_cr = db_connect(dbname).cursor()
+        try:
+            locker_cr.execute('SELECT id FROM social_hub_post WHERE id = %s FOR UPDATE', (locked_id,))
+            claimed_ids = self._claim(api.Environment(claimer_cr, SUPERUSER_ID, {})).ids
+        finally:
+            claimer_cr.rollback()
+            claimer_cr.close()
+            locker_cr.rollback()
+            locker_cr.close()
+        self.assertIn(free_id, claimed_ids)
+        self.assertNotIn(locked_id, claimed_ids)
+
+    def _delete_committed(self, dbname, post_ids, account_id):
+        cr = db_connect(dbname).cursor()
+        try:
+            env = api.Environment(cr, SUPERUSER_ID, NO_TRACKING)
+            env['social.hub.post'].browse(post_ids).unlink()
+            env['social.hub.account'].browse(account_id).unlink()
+            cr.commit()
+        finally:
+            cr.close()